@@ -0,0 +1,83 @@
+"""Per-call cost of the hot single-row lookups: statements rebuilt with db.query() on every
+call against the prebuilt ones in lcpms.lookups, on a seeded scratch database.
+
+"auth" is what get_current_user does on every authenticated request; "checkout" is the
+per-item medicine and stock lookups of POST /api/sales, for --items items.
+
+Run from backend/server/process:  python benchmarks/hot_lookups.py [--calls N] [--items N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+PROCESS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROCESS_DIR)
+
+from lcpms.config import Settings, configure_settings  # noqa: E402
+from lcpms.database import SessionLocal, configure_database, create_schema  # noqa: E402
+from lcpms.lookups import account_by_username, inventory_for_medicine, medicine_by_id  # noqa: E402
+from lcpms.models import Account, Inventory, Medicine  # noqa: E402
+from lcpms.seed import seed_demo_data  # noqa: E402
+
+def rebuilt_auth(db, username, medicine_ids):
+    return db.query(Account).filter(Account.username == username).first()
+
+def prebuilt_auth(db, username, medicine_ids):
+    return account_by_username(db, username)
+
+def rebuilt_checkout(db, username, medicine_ids):
+    for medicine_id in medicine_ids:
+        db.query(Medicine).filter(Medicine.id == medicine_id).first()
+        db.query(Inventory).filter(Inventory.medicine_id == medicine_id).first()
+
+def prebuilt_checkout(db, username, medicine_ids):
+    for medicine_id in medicine_ids:
+        medicine_by_id(db, medicine_id)
+        inventory_for_medicine(db, medicine_id)
+
+PATHS = {
+    "auth": (rebuilt_auth, prebuilt_auth),
+    "checkout": (rebuilt_checkout, prebuilt_checkout),
+}
+
+def measure(path, calls: int, medicine_ids: list) -> float:
+    # A fresh session per call, as each request gets, so the identity map never answers
+    for _ in range(min(calls, 200)):
+        db = SessionLocal()
+        path(db, "admin", medicine_ids)
+        db.close()
+    started = time.perf_counter()
+    for _ in range(calls):
+        db = SessionLocal()
+        path(db, "admin", medicine_ids)
+        db.close()
+    return (time.perf_counter() - started) / calls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        settings = replace(Settings.from_env(), database_path=os.path.join(scratch, "bench.db"))
+        configure_settings(settings)
+        configure_database(settings)
+        create_schema()
+        seed_demo_data()
+
+        db = SessionLocal()
+        medicine_ids = [medicine_id for (medicine_id,) in db.query(Medicine.id).order_by(Medicine.id).limit(args.items)]
+        db.close()
+
+        print(f"{'path':<10} {'rebuilt us':>11} {'prebuilt us':>12} {'saved':>7}")
+        for name, (rebuilt, prebuilt) in PATHS.items():
+            before = measure(rebuilt, args.calls, medicine_ids)
+            after = measure(prebuilt, args.calls, medicine_ids)
+            print(f"{name:<10} {before:>11.1f} {after:>12.1f} {1 - after / before:>7.0%}")
+
+if __name__ == "__main__":
+    main()
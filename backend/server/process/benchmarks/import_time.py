@@ -0,0 +1,54 @@
+"""Cold import time of the API modules, each measured in a fresh interpreter.
+
+Run from backend/server/process:  python benchmarks/import_time.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROCESS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    # What a report worker process or a script touching the ORM pays
+    "models": "import lcpms.models",
+    # Route registration without building an app
+    "routers": "import lcpms.app",
+    # What a new uvicorn worker pays before its startup hooks run
+    "main:app": "import main",
+}
+
+PROBE = """
+import time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+"""
+
+def measure(statement: str, runs: int):
+    env = dict(os.environ, PYTHONPATH=PROCESS_DIR, PYTHONDONTWRITEBYTECODE="0")
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)],
+            cwd=PROCESS_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so every run measures the same thing
+    measure(TARGETS["main:app"], 1)
+
+    print(f"{'target':<10} {'median ms':>10} {'min ms':>10}")
+    for name, statement in TARGETS.items():
+        timings = measure(statement, args.runs)
+        print(f"{name:<10} {statistics.median(timings):>10.1f} {min(timings):>10.1f}")
+
+if __name__ == "__main__":
+    main()
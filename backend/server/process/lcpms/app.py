@@ -0,0 +1,90 @@
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from .backups import start_backup_job, stop_backup_job
+from .config import Settings, configure_settings
+from .customer_index import customer_index
+from .customer_stats import backfill_customer_stats
+from .database import configure_database, create_schema
+from .idempotency import start_idempotency_cleanup_job, stop_idempotency_cleanup_job
+from .ledger import start_snapshot_scheduler, stop_snapshot_scheduler
+from .profiling import profile_requests, profiled_router
+from .purchasing import start_purchase_suggestion_job, stop_purchase_suggestion_job
+from .rate_limit import admission_control, configure_rate_limits
+from .replica import replica_refresher
+from .reports import fail_interrupted_report_jobs, stop_report_executor
+from .request_queue import queue_requests, start_request_queue
+from .routers import accounts, admin, auth, categories, dashboard, inventory, medicines, pos, prescriptions, purchase_orders, reports, sales, sync
+from .sales_archive import start_sales_archive_job, stop_sales_archive_job
+from .seed import seed_demo_data
+from .sku_index import sku_index
+from .state import create_shared_state, shared_state
+from .tasks import task_queue
+
+ROUTERS = [auth, accounts, categories, medicines, inventory, pos, prescriptions, sales, reports, purchase_orders, dashboard, sync, admin]
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    # Building the app opens no database connections and starts no threads: the engines
+    # and the shared state backend connect lazily, and state.db setup, schema creation,
+    # seeding and background workers all run from the startup hooks below.
+    settings = settings or Settings.from_env()
+    configure_settings(settings)
+    configure_database(settings)
+    configure_rate_limits(settings)
+    shared_state.configure(create_shared_state(settings))
+
+    app = FastAPI()
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Added last runs first: rate limits reject before a request takes a queue slot
+    app.middleware("http")(queue_requests)
+    app.middleware("http")(admission_control)
+
+    for module in ROUTERS:
+        app.include_router(profiled_router(module.router) if settings.profiling_enabled else module.router)
+    if settings.profiling_enabled:
+        app.middleware("http")(profile_requests)
+
+    startup = [
+        shared_state.start,
+        create_schema,
+        replica_refresher.start,
+        task_queue.start,
+        backfill_customer_stats,
+        start_request_queue,
+        start_snapshot_scheduler,
+        fail_interrupted_report_jobs,
+        start_purchase_suggestion_job,
+        start_sales_archive_job,
+        start_backup_job,
+        start_idempotency_cleanup_job,
+        sku_index.warm,
+        customer_index.sync,
+    ]
+    if settings.seed_demo_data:
+        startup.insert(startup.index(start_snapshot_scheduler) + 1, seed_demo_data)
+    for hook in startup:
+        app.on_event("startup")(hook)
+
+    for hook in [
+        replica_refresher.stop,
+        task_queue.stop,
+        shared_state.stop,
+        stop_snapshot_scheduler,
+        stop_report_executor,
+        stop_purchase_suggestion_job,
+        stop_sales_archive_job,
+        stop_backup_job,
+        stop_idempotency_cleanup_job,
+    ]:
+        app.on_event("shutdown")(hook)
+
+    return app
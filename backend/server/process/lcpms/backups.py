@@ -0,0 +1,264 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from .config import get_settings
+from .tasks import PeriodicJob
+
+# Online backups of data.db with SQLite's backup API: a few pages per step with a sleep
+# between steps, so writers only ever wait for one step; a copy that writes keep restarting
+# backs off and retries, see copy_database. The lock time of every step is
+# recorded in a manifest next to the copy; copies are integrity-checked before they count
+# and only the newest backup_keep are kept.
+#
+#     python -m lcpms.backups run
+#     python -m lcpms.backups list
+#     python -m lcpms.backups restore backups/data-20260101-020000-000000.db
+#
+# Restore with the API stopped: the copy is checked against its manifest, written over the
+# database through the backup API, and the result is integrity-checked and its per-table
+# row counts compared with the manifest.
+
+logger = logging.getLogger(__name__)
+backup_lock = threading.Lock()
+
+class BackupInProgress(Exception):
+    pass
+
+class BackupTimedOut(Exception):
+    pass
+
+class CopyRestarting(Exception):
+    # Raised from the progress callback to abandon a stepped copy that keeps restarting
+    pass
+
+def copy_database(source_path: str, target_path: str, pages: int, step_sleep: float,
+                  max_restarts: int = 3, max_seconds: float = 0, retry_delay: float = 1) -> dict:
+    # SQLite restarts an online backup from page 0 whenever another connection writes to
+    # the source, so a slow stepped copy of a busy database may never finish. After
+    # max_restarts the attempt is abandoned and, after retry_delay seconds (doubled for
+    # each further attempt), a new stepped copy is started once the write burst has had
+    # time to pass. The copy is never taken in one step, which would hold a read lock on
+    # the whole database and block writers; max_seconds (0: no limit) fails it with
+    # BackupTimedOut instead, and the next scheduled run tries again.
+    stats = {"pages": 0, "steps": 0, "busySteps": 0, "restarts": 0, "attempts": 1, "lockSeconds": 0.0, "maxStepSeconds": 0.0}
+    last_remaining = None
+    attempt_restarts = 0
+    started = step_started = time.perf_counter()
+
+    def check_deadline(remaining, total):
+        if max_seconds and time.perf_counter() - started > max_seconds:
+            raise BackupTimedOut(
+                f"Backup of {source_path} did not finish within {max_seconds:g}s "
+                f"({stats['attempts']} attempts, {stats['restarts']} restarts, {remaining} of {total} pages left)"
+            )
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining, attempt_restarts, step_started
+        # The source is locked during a step, never while we sleep between them. Step wall
+        # time is recorded, an upper bound that includes waiting for the lock and the GIL.
+        held = time.perf_counter() - step_started
+        busy = status in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+        stats["steps"] += 1
+        if busy:
+            stats["busySteps"] += 1
+        else:
+            stats["lockSeconds"] += held
+            stats["maxStepSeconds"] = max(stats["maxStepSeconds"], held)
+        stats["pages"] = total
+        if not busy and last_remaining is not None and remaining >= last_remaining:
+            # A step that copied pages but left no fewer to go: another connection wrote to
+            # the source and SQLite started the copy over (remaining only grows when the
+            # write also added pages)
+            stats["restarts"] += 1
+            attempt_restarts += 1
+        last_remaining = remaining
+        check_deadline(remaining, total)
+        if remaining and attempt_restarts > max_restarts:
+            raise CopyRestarting()
+        if remaining:
+            time.sleep(step_sleep)
+        step_started = time.perf_counter()
+
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        delay = retry_delay
+        while True:
+            # Sleeping (also after a busy step) is left to progress so it is never counted as lock time
+            try:
+                source.backup(target, pages=pages, progress=progress, sleep=0)
+                break
+            except CopyRestarting:
+                if max_seconds:
+                    delay = min(delay, max(max_seconds - (time.perf_counter() - started), 0))
+                logger.warning(
+                    "Backup of %s restarted %s times; retrying in %.1fs", source_path, attempt_restarts, delay
+                )
+                time.sleep(delay)
+                check_deadline(last_remaining, stats["pages"])
+                delay *= 2
+                stats["attempts"] += 1
+                last_remaining = None
+                attempt_restarts = 0
+                step_started = time.perf_counter()
+    finally:
+        target.close()
+        source.close()
+
+    stats["lockSeconds"] = round(stats["lockSeconds"], 6)
+    stats["maxStepSeconds"] = round(stats["maxStepSeconds"], 6)
+    return stats
+
+def integrity_check(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise RuntimeError(f"Integrity check of {path} failed: {result}")
+
+def table_counts(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        tables = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def manifest_path(backup_path: str) -> str:
+    return f"{backup_path}.json"
+
+def run_backup() -> dict:
+    if not backup_lock.acquire(blocking=False):
+        raise BackupInProgress("A backup is already running")
+    try:
+        settings = get_settings()
+        os.makedirs(settings.backup_dir, exist_ok=True)
+        started_at = datetime.utcnow()
+        backup_path = os.path.join(settings.backup_dir, f"data-{started_at:%Y%m%d-%H%M%S-%f}.db")
+        staging_path = f"{backup_path}.tmp"
+
+        started = time.perf_counter()
+        try:
+            stats = copy_database(
+                settings.database_path, staging_path, settings.backup_pages, settings.backup_step_sleep,
+                settings.backup_max_restarts, settings.backup_max_seconds, settings.backup_retry_delay
+            )
+            integrity_check(staging_path)
+        except Exception:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+            raise
+        os.replace(staging_path, backup_path)
+
+        manifest = dict(
+            stats,
+            file=os.path.basename(backup_path),
+            createdAt=started_at.isoformat(),
+            seconds=round(time.perf_counter() - started, 3),
+            bytes=os.path.getsize(backup_path),
+            sha256=file_sha256(backup_path),
+            tables=table_counts(backup_path),
+        )
+        with open(manifest_path(backup_path), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        logger.info(
+            "Backup %s: %s pages in %s steps, lock held %.3fs (max step %.4fs), %s restarts over %s attempts",
+            manifest["file"], stats["pages"], stats["steps"], stats["lockSeconds"], stats["maxStepSeconds"],
+            stats["restarts"], stats["attempts"]
+        )
+        prune_backups(settings.backup_dir, settings.backup_keep)
+        return manifest
+    finally:
+        backup_lock.release()
+
+def list_backups(backup_dir: str) -> list:
+    # Newest first; a copy without a manifest never finished and is not listed
+    if not os.path.isdir(backup_dir):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(backup_dir), reverse=True):
+        if name.startswith("data-") and name.endswith(".db.json"):
+            with open(os.path.join(backup_dir, name)) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+def prune_backups(backup_dir: str, keep: int):
+    for manifest in list_backups(backup_dir)[max(keep, 1):]:
+        backup_path = os.path.join(backup_dir, manifest["file"])
+        for path in (manifest_path(backup_path), backup_path):
+            if os.path.exists(path):
+                os.remove(path)
+        logger.info("Removed backup %s", manifest["file"])
+
+def restore_backup(backup_path: str, database_path: str) -> dict:
+    with open(manifest_path(backup_path)) as f:
+        manifest = json.load(f)
+    if file_sha256(backup_path) != manifest["sha256"]:
+        raise RuntimeError(f"{backup_path} does not match its manifest checksum")
+    integrity_check(backup_path)
+
+    # Through the backup API rather than a file copy, so the target's WAL and locks stay
+    # consistent. pages=-1 copies in one step, holding a write lock on database_path for the
+    # whole restore: anything still connected to it waits or fails with "database is locked".
+    stats = copy_database(backup_path, database_path, pages=-1, step_sleep=0)
+    integrity_check(database_path)
+    restored = table_counts(database_path)
+    if restored != manifest["tables"]:
+        raise RuntimeError(f"Restored row counts differ from the backup: {restored} != {manifest['tables']}")
+    return dict(stats, file=manifest["file"], tables=restored)
+
+def scheduled_backup(db):
+    try:
+        run_backup()
+    except BackupInProgress:
+        logger.info("Skipping scheduled backup, one is already running")
+
+backup_job = PeriodicJob("backups", scheduled_backup)
+
+def start_backup_job():
+    backup_job.start(get_settings().backup_interval)
+
+def stop_backup_job():
+    backup_job.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Online backups of data.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("run", help="take a backup now")
+    commands.add_parser("list", help="list backups, newest first")
+    restore = commands.add_parser("restore", help="verify a backup and restore it (stop the API first)")
+    restore.add_argument("backup")
+    restore.add_argument("--database", help="database to overwrite (default: DATABASE_PATH)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    if args.command == "run":
+        print(json.dumps(run_backup(), indent=2))
+    elif args.command == "list":
+        for manifest in list_backups(settings.backup_dir):
+            print(f"{manifest['file']}  {manifest['bytes']:>12}  lock {manifest['lockSeconds']:.3f}s  steps {manifest['steps']}")
+    else:
+        print(json.dumps(restore_backup(args.backup, args.database or settings.database_path), indent=2))
+
+if __name__ == "__main__":
+    main()
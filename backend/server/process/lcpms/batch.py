@@ -0,0 +1,21 @@
+from fastapi import HTTPException
+
+# ?ids=3,1,2 batch lookups: ids are resolved with IN queries of at most ID_CHUNK_SIZE
+# parameters (under SQLite's bound variable limit) and returned in the requested order.
+# Unknown ids are left out and repeated ids are returned once.
+ID_CHUNK_SIZE = 500
+
+def parse_ids(ids: str) -> list:
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    return list(dict.fromkeys(parsed))
+
+def fetch_in_order(ids: list, fetch_chunk) -> list:
+    # fetch_chunk(chunk) returns the rows (with an id attribute) for one IN query
+    found = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        for row in fetch_chunk(ids[start:start + ID_CHUNK_SIZE]):
+            found[row.id] = row
+    return [found[row_id] for row_id in ids if row_id in found]
@@ -0,0 +1,197 @@
+import codecs
+import csv
+import re
+from datetime import date, datetime
+
+import anyio.from_thread
+from fastapi import HTTPException, Request
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .deps import get_current_user, is_pharmacist_or_admin
+from .models import Category, Inventory, Medicine, StockMovement
+from .sku_index import publish_medicine_changes
+
+# CSV columns: name, sku, category (name or id), price, and optionally description, dosage,
+# manufacturer, requires_prescription, quantity, min_stock_level, batch_number, expiry_date,
+# supplier. Rows are upserted by sku; new SKUs with a quantity also get an inventory batch.
+IMPORT_MAX_REPORTED_ERRORS = 1000
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+def iter_request_lines(request: Request):
+    # Runs in a worker thread and pulls body chunks from the event loop as the CSV reader needs them
+    stream = request.stream()
+
+    async def next_chunk():
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    while True:
+        chunk = anyio.from_thread.run(next_chunk)
+        if chunk is None:
+            break
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+def parse_import_row(row: dict, category_ids: dict):
+    name = (row.get("name") or "").strip()
+    sku = (row.get("sku") or "").strip()
+    if not name or not sku:
+        raise ValueError("name and sku are required")
+
+    category = (row.get("category") or "").strip()
+    category_id = category_ids.get(category.lower())
+    if category_id is None:
+        raise ValueError(f"Unknown category '{category}'")
+
+    try:
+        price = float(row.get("price") or "")
+    except ValueError:
+        raise ValueError("price must be a number")
+
+    medicine = {
+        "name": name,
+        "sku": sku,
+        "category_id": category_id,
+        "description": row.get("description") or None,
+        "dosage": row.get("dosage") or None,
+        "manufacturer": row.get("manufacturer") or None,
+        "price": price,
+        "requires_prescription": (row.get("requires_prescription") or "").strip().lower() in TRUE_VALUES,
+    }
+
+    inventory = None
+    if (row.get("quantity") or "").strip():
+        batch_number = row.get("batch_number") or None
+        if batch_number and not re.match(r"^BATCH\d{4}$", batch_number):
+            raise ValueError("batch_number must follow format 'BATCH####'")
+        try:
+            inventory = {
+                "quantity": int(row["quantity"]),
+                "min_stock_level": int(row.get("min_stock_level") or 10),
+                "batch_number": batch_number,
+                "expiry_date": date.fromisoformat(row["expiry_date"]) if row.get("expiry_date") else None,
+                "supplier": row.get("supplier") or None,
+            }
+        except ValueError as e:
+            raise ValueError(f"Invalid inventory fields: {e}")
+
+    return medicine, inventory
+
+def upsert_medicine_batch(db: Session, batch: list):
+    skus = [medicine["sku"] for medicine, _ in batch]
+    existing = {sku for (sku,) in db.query(Medicine.sku).filter(Medicine.sku.in_(skus))}
+
+    # Dialect modules are imported here rather than at module load; only imports need them
+    from sqlalchemy.dialects import postgresql as postgresql_dialect, sqlite as sqlite_dialect
+
+    # Core statements with executemany: compiled once per batch, not once per row
+    dialect = sqlite_dialect if db.get_bind().dialect.name == "sqlite" else postgresql_dialect
+    statement = dialect.insert(Medicine.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["sku"],
+        set_={
+            column: statement.excluded[column]
+            for column in ("name", "category_id", "description", "dosage", "manufacturer", "price", "requires_prescription")
+        },
+    )
+    now = datetime.utcnow()
+    medicine_ids = db.execute(
+        statement.returning(Medicine.__table__.c.id), [dict(medicine, created_at=now) for medicine, _ in batch]
+    ).scalars().all()
+
+    new_stock = {medicine["sku"]: inventory for medicine, inventory in batch if inventory and medicine["sku"] not in existing}
+    if new_stock:
+        # Bulk path for new batches: inventory rows and their receipt movements are inserted
+        # set-wise rather than through record_movement one object at a time
+        ids_by_sku = dict(db.query(Medicine.sku, Medicine.id).filter(Medicine.sku.in_(list(new_stock))))
+        inventory_table = Inventory.__table__
+        created_batches = db.execute(
+            inventory_table.insert().returning(inventory_table.c.id, inventory_table.c.medicine_id, inventory_table.c.quantity),
+            [dict(fields, medicine_id=ids_by_sku[sku], created_at=now, updated_at=now) for sku, fields in new_stock.items()]
+        ).all()
+        db.execute(StockMovement.__table__.insert(), [
+            {
+                "inventory_id": inventory_id,
+                "medicine_id": medicine_id,
+                "movement_type": "receipt",
+                "quantity": quantity,
+                "note": "catalog import",
+                "created_at": now,
+            }
+            for inventory_id, medicine_id, quantity in created_batches
+        ])
+
+    return len(batch) - len(existing), len(existing), medicine_ids
+
+def import_medicine_csv(request: Request, db: Session):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can import medicines")
+
+    category_ids = {}
+    for category_id, name in db.query(Category.id, Category.name):
+        category_ids[name.lower()] = category_id
+        category_ids[str(category_id)] = category_id
+
+    reader = csv.DictReader(iter_request_lines(request))
+    missing = {"name", "sku", "category", "price"} - set(reader.fieldnames or [])
+    if missing:
+        raise HTTPException(status_code=400, detail=f"CSV is missing columns: {', '.join(sorted(missing))}")
+
+    batch_size = get_settings().import_batch_size
+    created = updated = error_count = 0
+    errors = []
+    seen_skus = set()
+    batch = []
+    changed_ids = []
+
+    def flush_batch():
+        nonlocal created, updated
+        batch_created, batch_updated, batch_ids = upsert_medicine_batch(db, batch)
+        created += batch_created
+        updated += batch_updated
+        changed_ids.extend(batch_ids)
+        batch.clear()
+
+    # Row 1 is the header
+    for row_number, row in enumerate(reader, start=2):
+        try:
+            medicine, inventory = parse_import_row(row, category_ids)
+            if medicine["sku"] in seen_skus:
+                raise ValueError("Duplicate sku in file")
+        except ValueError as e:
+            error_count += 1
+            if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "sku": row.get("sku"), "error": str(e)})
+            continue
+
+        seen_skus.add(medicine["sku"])
+        batch.append((medicine, inventory))
+        if len(batch) >= batch_size:
+            flush_batch()
+
+    if batch:
+        flush_batch()
+
+    # One transaction for the whole file
+    db.commit()
+    publish_medicine_changes(changed_ids)
+
+    return {
+        "message": "Import finished",
+        "created": created,
+        "updated": updated,
+        "errorCount": error_count,
+        "errors": errors,
+    }
@@ -0,0 +1,33 @@
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from .models import ChangeLog
+
+# Change sequence for delta sync. Triggers on the synced tables replace the change_log row
+# of (entity, id), so every write, including bulk updates and catalog imports, moves that
+# row to the next AUTOINCREMENT id. (Delete then insert rather than INSERT OR REPLACE: an
+# outer upsert overrides a trigger's conflict clause.) SQLite has one writer at a
+# time, so a reader that sees sequence N has also seen every change below it.
+TRACKED_TABLES = ["medicines", "inventory", "categories", "accounts", "prescriptions"]
+
+TRIGGER = """
+CREATE TRIGGER change_log_{table}_{operation} AFTER {operation} ON {table}
+BEGIN
+    DELETE FROM change_log WHERE entity = '{table}' AND entity_id = {row}.id;
+    INSERT INTO change_log (entity, entity_id, deleted) VALUES ('{table}', {row}.id, {deleted});
+END
+"""
+
+def install_change_triggers(engine):
+    with engine.begin() as conn:
+        for table in TRACKED_TABLES:
+            for operation, row, deleted in (("insert", "NEW", 0), ("update", "NEW", 0), ("delete", "OLD", 1)):
+                # Recreated on every start so a changed definition reaches existing databases
+                conn.execute(text(f"DROP TRIGGER IF EXISTS change_log_{table}_{operation}"))
+                conn.execute(text(TRIGGER.format(table=table, operation=operation, row=row, deleted=deleted)))
+
+def current_sequence(db: Session) -> int:
+    return db.query(func.coalesce(func.max(ChangeLog.id), 0)).scalar()
+
+def changes_since(db: Session, since: int, limit: int):
+    return db.query(ChangeLog).filter(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit).all()
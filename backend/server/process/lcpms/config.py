@@ -0,0 +1,172 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."))
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+@dataclass
+class Settings:
+    database_path: str = os.path.join(PROJECT_ROOT, "data.db")
+    cors_origins: list = field(default_factory=lambda: ["http://localhost:5173"])
+    seed_demo_data: bool = True
+
+    # Read replica: "off" reads from the primary, "sqlite" keeps a copy of data.db refreshed
+    # with the online backup API, "url" uses replica_database_url (e.g. a Postgres standby)
+    read_replica: str = "off"
+    replica_path: str = os.path.join(PROJECT_ROOT, "data.replica.db")
+    replica_database_url: Optional[str] = None
+    replica_refresh_interval: float = 5
+    replica_refresh_max_seconds: float = 30  # a refresh still copying after this is dropped
+    read_your_writes_window: float = 10
+
+    # Sync handlers run on worker_threads threads; the pool gives each of them two
+    # connections (request session plus a helper's, see database.py) and db_pool_overflow
+    # more for background workers
+    worker_threads: int = 40
+    db_pool_overflow: int = 10
+    db_pool_timeout: float = 10
+    # Compiled SQL per engine; ?fields= selections each compile their own statement, so
+    # this sits well above SQLAlchemy's default of 500 to keep hot statements from churning
+    query_cache_size: int = 1500
+    queue_deadline: float = 5
+
+    rate_limits: dict = field(default_factory=dict)  # per route class overrides, see rate_limit
+    rate_limit_idle_seconds: float = 600
+    rate_limit_max_keys: int = 100000
+
+    task_workers: int = 2
+    task_max_attempts: int = 5
+    task_poll_interval: float = 2.0
+    # A running task whose worker has not finished it within the lease is assumed lost
+    # (its process died) and goes back to pending; keep it well above handler run times
+    task_lease_seconds: float = 300
+
+    state_backend: str = "memory"
+    state_db_path: str = os.path.join(PROJECT_ROOT, "state.db")
+    state_invalidation_interval: float = 0.5
+    session_ttl: int = 43200
+
+    stock_snapshot_interval: int = 3600
+
+    idempotency_ttl: int = 86400
+    idempotency_wait_timeout: float = 15
+    idempotency_lock_timeout: int = 60
+    idempotency_cleanup_interval: float = 3600  # expired keys are purged off the request path
+
+    store_code: str = "MAIN"
+    sale_number_block_size: int = 50  # 1 gives store-wide allocation order, see sale_numbers.py
+
+    import_batch_size: int = 1000
+
+    sales_archive_after_days: int = 365  # 0 keeps every sale in the hot tables
+    sales_archive_chunk_size: int = 500
+    sales_archive_interval: float = 3600
+
+    # Online backups: backup_pages per step, backup_step_sleep seconds between steps
+    backup_dir: str = os.path.join(PROJECT_ROOT, "backups")
+    backup_interval: float = 86400  # 0 disables scheduled backups
+    backup_keep: int = 7
+    backup_pages: int = 64
+    backup_step_sleep: float = 0.005
+    backup_max_restarts: int = 3  # then the copy is abandoned and retried after a back-off
+    backup_retry_delay: float = 1  # seconds before the first retry, doubled for each further one
+    backup_max_seconds: float = 300  # a copy still running after this fails; 0 disables
+
+    # Admin-only request profiling (see profiling.py); off means nothing is installed
+    profiling_enabled: bool = False
+    profile_dir: str = os.path.join(PROJECT_ROOT, "profiles")
+    profile_sample_interval: float = 0.005
+    profile_max_seconds: float = 60
+
+    report_workers: int = 2
+    report_chunk_size: int = 2000
+    report_job_lease: float = 1800  # a pending report job older than this lost its process
+
+    po_expiry_horizon_days: int = 30
+    po_demand_window_days: int = 28
+    po_cover_days: int = 30
+    po_refresh_interval: float = 300
+
+    @property
+    def database_url(self) -> str:
+        return f"sqlite:///{self.database_path}"
+
+    @classmethod
+    def from_env(cls):
+        defaults = cls()
+        return cls(
+            database_path=os.getenv("DATABASE_PATH", defaults.database_path),
+            seed_demo_data=os.getenv("SEED_DEMO_DATA", "1") not in ("0", "false", "no"),
+            read_replica=os.getenv("READ_REPLICA", defaults.read_replica),
+            replica_path=os.getenv("REPLICA_PATH", defaults.replica_path),
+            replica_database_url=os.getenv("REPLICA_DATABASE_URL"),
+            replica_refresh_interval=env_float("REPLICA_REFRESH_INTERVAL", defaults.replica_refresh_interval),
+            replica_refresh_max_seconds=env_float("REPLICA_REFRESH_MAX_SECONDS", defaults.replica_refresh_max_seconds),
+            read_your_writes_window=env_float("READ_YOUR_WRITES_WINDOW", defaults.read_your_writes_window),
+            worker_threads=env_int("WORKER_THREADS", defaults.worker_threads),
+            db_pool_overflow=env_int("DB_POOL_OVERFLOW", defaults.db_pool_overflow),
+            db_pool_timeout=env_float("DB_POOL_TIMEOUT", defaults.db_pool_timeout),
+            query_cache_size=env_int("QUERY_CACHE_SIZE", defaults.query_cache_size),
+            queue_deadline=env_float("QUEUE_DEADLINE", defaults.queue_deadline),
+            rate_limits=json.loads(os.getenv("RATE_LIMITS", "{}")),
+            rate_limit_idle_seconds=env_float("RATE_LIMIT_IDLE_SECONDS", defaults.rate_limit_idle_seconds),
+            rate_limit_max_keys=env_int("RATE_LIMIT_MAX_KEYS", defaults.rate_limit_max_keys),
+            task_workers=env_int("TASK_WORKERS", defaults.task_workers),
+            task_max_attempts=env_int("TASK_MAX_ATTEMPTS", defaults.task_max_attempts),
+            task_poll_interval=env_float("TASK_POLL_INTERVAL", defaults.task_poll_interval),
+            task_lease_seconds=env_float("TASK_LEASE_SECONDS", defaults.task_lease_seconds),
+            state_backend=os.getenv("STATE_BACKEND", defaults.state_backend),
+            state_db_path=os.getenv("STATE_DB_PATH", defaults.state_db_path),
+            state_invalidation_interval=env_float("STATE_INVALIDATION_INTERVAL", defaults.state_invalidation_interval),
+            session_ttl=env_int("SESSION_TTL", defaults.session_ttl),
+            stock_snapshot_interval=env_int("STOCK_SNAPSHOT_INTERVAL", defaults.stock_snapshot_interval),
+            idempotency_ttl=env_int("IDEMPOTENCY_TTL", defaults.idempotency_ttl),
+            idempotency_wait_timeout=env_float("IDEMPOTENCY_WAIT_TIMEOUT", defaults.idempotency_wait_timeout),
+            idempotency_lock_timeout=env_int("IDEMPOTENCY_LOCK_TIMEOUT", defaults.idempotency_lock_timeout),
+            idempotency_cleanup_interval=env_float("IDEMPOTENCY_CLEANUP_INTERVAL", defaults.idempotency_cleanup_interval),
+            store_code=os.getenv("STORE_CODE", defaults.store_code),
+            sale_number_block_size=env_int("SALE_NUMBER_BLOCK_SIZE", defaults.sale_number_block_size),
+            import_batch_size=env_int("IMPORT_BATCH_SIZE", defaults.import_batch_size),
+            sales_archive_after_days=env_int("SALES_ARCHIVE_AFTER_DAYS", defaults.sales_archive_after_days),
+            sales_archive_chunk_size=env_int("SALES_ARCHIVE_CHUNK_SIZE", defaults.sales_archive_chunk_size),
+            sales_archive_interval=env_float("SALES_ARCHIVE_INTERVAL", defaults.sales_archive_interval),
+            backup_dir=os.getenv("BACKUP_DIR", defaults.backup_dir),
+            backup_interval=env_float("BACKUP_INTERVAL", defaults.backup_interval),
+            backup_keep=env_int("BACKUP_KEEP", defaults.backup_keep),
+            backup_pages=env_int("BACKUP_PAGES", defaults.backup_pages),
+            backup_step_sleep=env_float("BACKUP_STEP_SLEEP", defaults.backup_step_sleep),
+            backup_max_restarts=env_int("BACKUP_MAX_RESTARTS", defaults.backup_max_restarts),
+            backup_retry_delay=env_float("BACKUP_RETRY_DELAY", defaults.backup_retry_delay),
+            backup_max_seconds=env_float("BACKUP_MAX_SECONDS", defaults.backup_max_seconds),
+            profiling_enabled=os.getenv("PROFILING", "0") not in ("0", "false", "no"),
+            profile_dir=os.getenv("PROFILE_DIR", defaults.profile_dir),
+            profile_sample_interval=env_float("PROFILE_SAMPLE_INTERVAL", defaults.profile_sample_interval),
+            profile_max_seconds=env_float("PROFILE_MAX_SECONDS", defaults.profile_max_seconds),
+            report_workers=env_int("REPORT_WORKERS", defaults.report_workers),
+            report_chunk_size=env_int("REPORT_CHUNK_SIZE", defaults.report_chunk_size),
+            report_job_lease=env_float("REPORT_JOB_LEASE", defaults.report_job_lease),
+            po_expiry_horizon_days=env_int("PO_EXPIRY_HORIZON_DAYS", defaults.po_expiry_horizon_days),
+            po_demand_window_days=env_int("PO_DEMAND_WINDOW_DAYS", defaults.po_demand_window_days),
+            po_cover_days=env_int("PO_COVER_DAYS", defaults.po_cover_days),
+            po_refresh_interval=env_float("PO_REFRESH_INTERVAL", defaults.po_refresh_interval),
+        )
+
+settings = None
+
+def get_settings() -> Settings:
+    # Settings of the app built by create_app; scripts that never build one read the environment
+    global settings
+    if settings is None:
+        settings = Settings.from_env()
+    return settings
+
+def configure_settings(new_settings: Settings):
+    global settings
+    settings = new_settings
@@ -0,0 +1,142 @@
+import bisect
+import re
+import threading
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import Account
+from .state import shared_state
+
+# Typeahead over customers: a sorted list of (token, account id) where the tokens are the
+# words of full_name, the username, the email (whole and its local part) and the digits of
+# phone_number, so a prefix query is a bisect plus a short scan. Account writes publish
+# "account:<id>" after they commit and the next lookup re-reads just those accounts.
+
+NON_DIGITS = re.compile(r"\D")
+PHONE_QUERY = re.compile(r"^[\d\s()+.-]+$")
+
+def account_tokens(account) -> set:
+    tokens = set((account.full_name or "").lower().split())
+    if account.username:
+        tokens.add(account.username.lower())
+    if account.email:
+        email = account.email.lower()
+        tokens.update((email, email.split("@")[0]))
+    phone = NON_DIGITS.sub("", account.phone_number or "")
+    if phone:
+        tokens.add(phone)
+    return tokens
+
+def query_words(q: str) -> list:
+    if PHONE_QUERY.match(q) and NON_DIGITS.sub("", q):
+        return [NON_DIGITS.sub("", q)]
+    return q.lower().split()
+
+class CustomerIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = []  # sorted (token, account id)
+        self.tokens_by_account = {}
+        self.accounts = {}  # account id -> lookup result
+        self.loaded = False
+        self.dirty = set()
+
+    def invalidate(self, key: str):
+        if key.startswith("account:"):
+            with self.lock:
+                self.dirty.add(int(key[len("account:"):]))
+
+    def query(self, db: Session):
+        return db.query(
+            Account.id, Account.username, Account.full_name, Account.email, Account.phone_number, Account.status
+        ).filter(Account.role == "customer")
+
+    def remove(self, account_id: int):
+        for token in self.tokens_by_account.pop(account_id, ()):
+            position = bisect.bisect_left(self.tokens, (token, account_id))
+            if position < len(self.tokens) and self.tokens[position] == (token, account_id):
+                del self.tokens[position]
+        self.accounts.pop(account_id, None)
+
+    def add(self, account, tokens: list = None):
+        # Appends to tokens when given (load sorts once at the end), else inserts in order
+        own_tokens = account_tokens(account)
+        for token in own_tokens:
+            if tokens is None:
+                bisect.insort(self.tokens, (token, account.id))
+            else:
+                tokens.append((token, account.id))
+        self.tokens_by_account[account.id] = own_tokens
+        self.accounts[account.id] = {
+            "id": account.id,
+            "username": account.username,
+            "fullName": account.full_name,
+            "email": account.email,
+            "phone": account.phone_number,
+            "isActive": account.status == "active",
+        }
+
+    def load(self, db: Session):
+        # Writes that land while the query runs stay dirty and are re-read on the next lookup
+        with self.lock:
+            self.dirty.clear()
+        rows = self.query(db).all()
+        with self.lock:
+            self.tokens_by_account, self.accounts = {}, {}
+            tokens = []
+            for row in rows:
+                self.add(row, tokens)
+            tokens.sort()
+            self.tokens = tokens
+            self.loaded = True
+
+    def sync(self):
+        # Full load on first use, then only the accounts written since the previous lookup
+        with self.lock:
+            loaded, dirty = self.loaded, set(self.dirty)
+        if loaded and not dirty:
+            return
+        db = SessionLocal()
+        try:
+            if not loaded:
+                self.load(db)
+                return
+            with self.lock:
+                self.dirty -= dirty
+            rows = self.query(db).filter(Account.id.in_(dirty)).all()
+            with self.lock:
+                for account_id in dirty:
+                    self.remove(account_id)
+                for row in rows:
+                    self.add(row)
+        finally:
+            db.close()
+
+    def lookup(self, q: str, limit: int) -> list:
+        words = query_words(q)
+        if not words:
+            return []
+        self.sync()
+
+        first, rest = words[0], words[1:]
+        results = []
+        seen = set()
+        with self.lock:
+            position = bisect.bisect_left(self.tokens, (first,))
+            while position < len(self.tokens) and len(results) < limit:
+                token, account_id = self.tokens[position]
+                if not token.startswith(first):
+                    break
+                position += 1
+                if account_id in seen:
+                    continue
+                seen.add(account_id)
+                # Every further word has to prefix one of the account's other tokens
+                own_tokens = self.tokens_by_account[account_id]
+                if all(any(candidate.startswith(word) for candidate in own_tokens) for word in rest):
+                    results.append(self.accounts[account_id])
+        return results
+
+customer_index = CustomerIndex()
+shared_state.on_invalidate(customer_index.invalidate)
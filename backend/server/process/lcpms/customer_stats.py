@@ -0,0 +1,63 @@
+import json
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import CustomerStats, Medicine, Sale
+from .sales_archive import sales_tables
+from .tasks import subscribe
+
+# Lifetime aggregates per customer, recomputed in the background whenever one of the
+# customer's sales is created, refunded or deleted. Refunded sales are not counted.
+CUSTOMER_TOP_MEDICINES = 5
+
+def refresh_customer_stats(db: Session, customer_id: int):
+    # Lifetime figures, so archived sales count too
+    sales, items = sales_tables(db)
+    counted = (sales.c.customer_id == customer_id, sales.c.status != "refunded")
+    visit_count, lifetime_spend, last_visit = db.query(
+        func.count(sales.c.id),
+        func.coalesce(func.sum(sales.c.total_amount), 0),
+        func.max(sales.c.created_at)
+    ).filter(*counted).one()
+
+    top_medicines = db.query(
+        items.c.medicine_id,
+        Medicine.name,
+        func.sum(items.c.quantity).label("quantity")
+    ).select_from(items).join(sales, sales.c.id == items.c.sale_id).outerjoin(
+        Medicine, Medicine.id == items.c.medicine_id
+    ).filter(*counted).group_by(items.c.medicine_id, Medicine.name).order_by(
+        func.sum(items.c.quantity).desc()
+    ).limit(CUSTOMER_TOP_MEDICINES).all()
+
+    stats = db.query(CustomerStats).filter(CustomerStats.customer_id == customer_id).first()
+    if not stats:
+        stats = CustomerStats(customer_id=customer_id)
+        db.add(stats)
+    stats.visit_count = visit_count
+    stats.lifetime_spend = lifetime_spend
+    stats.last_visit = last_visit
+    stats.top_medicines = json.dumps([
+        {"medicineId": medicine_id, "name": name, "quantity": int(quantity)}
+        for medicine_id, name, quantity in top_medicines
+    ])
+
+@subscribe("sale.created")
+@subscribe("sale.updated")
+@subscribe("sale.deleted")
+def update_customer_stats(payload: dict, db: Session):
+    if payload.get("customerId"):
+        refresh_customer_stats(db, payload["customerId"])
+
+def backfill_customer_stats():
+    db = SessionLocal()
+    missing = db.query(Sale.customer_id).filter(
+        Sale.customer_id != None,
+        ~db.query(CustomerStats).filter(CustomerStats.customer_id == Sale.customer_id).exists()
+    ).distinct().all()
+    for (customer_id,) in missing:
+        refresh_customer_stats(db, customer_id)
+    db.commit()
+    db.close()
@@ -0,0 +1,100 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from .config import Settings
+
+Base = declarative_base()
+
+# Bound by configure_database when the app is created, so importing models never opens the database
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+engine = None
+read_engine = None
+
+def configure_database(settings: Settings):
+    global engine, read_engine
+    # A handler can hold two primary connections at once: its request session and a
+    # short-lived SessionLocal() opened by a helper (idempotency claim/release, sale number
+    # block reservation, SKU and customer index refreshes). The pool is sized for that so
+    # a full set of worker threads never waits on itself.
+    engine = create_engine(
+        settings.database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.worker_threads * 2,
+        max_overflow=settings.db_pool_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        query_cache_size=settings.query_cache_size,
+    )
+
+    if settings.read_replica == "sqlite":
+        # No pooling: each read session must open the latest replica file
+        read_engine = create_engine(
+            f"sqlite:///{settings.replica_path}",
+            connect_args={"check_same_thread": False},
+            poolclass=NullPool,
+            query_cache_size=settings.query_cache_size,
+        )
+    elif settings.read_replica == "url":
+        # Only request read sessions use the replica; the helpers above always go to the primary
+        read_engine = create_engine(
+            settings.replica_database_url,
+            pool_size=settings.worker_threads,
+            max_overflow=settings.db_pool_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            query_cache_size=settings.query_cache_size,
+        )
+    else:
+        read_engine = engine
+
+    SessionLocal.configure(bind=engine)
+    ReadSessionLocal.configure(bind=read_engine)
+
+def rebuild_table(conn, table):
+    # SQLite cannot add AUTOINCREMENT to an existing table: move the rows into a fresh copy.
+    # legacy_alter_table keeps the rename from rewriting other tables' foreign keys to the
+    # old copy; the indexes follow the renamed table and are dropped so the new ones can
+    # take their names.
+    old_name = f"{table.name}_before_rebuild"
+    conn.execute(text("PRAGMA legacy_alter_table = ON"))
+    conn.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "{old_name}"'))
+    for (index_name,) in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": old_name}).all():
+        conn.execute(text(f'DROP INDEX "{index_name}"'))
+    table.create(bind=conn)
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    conn.execute(text(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{old_name}"'))
+    conn.execute(text(f'DROP TABLE "{old_name}"'))
+    conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+
+def sync_schema():
+    # create_all only creates missing tables; bring existing SQLite tables up to date
+    # with columns and indexes added to the models since they were created, and rebuild
+    # tables that have since been declared sqlite_autoincrement
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+            create_sql = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+            ).scalar()
+            if table.dialect_options["sqlite"]["autoincrement"] and "AUTOINCREMENT" not in create_sql.upper():
+                rebuild_table(conn, table)
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+def create_schema():
+    from . import models  # noqa: F401 -- registers every table on Base.metadata
+    from .changes import install_change_triggers
+    from .sales_archive import protect_archived_ids
+
+    Base.metadata.create_all(bind=engine)
+    sync_schema()
+    install_change_triggers(engine)
+    with engine.begin() as conn:
+        protect_archived_ids(conn)
@@ -0,0 +1,57 @@
+from fastapi import HTTPException, Request
+from sqlalchemy.orm import Session
+
+from . import database
+from .config import get_settings
+from .database import ReadSessionLocal, SessionLocal
+from .lookups import account_by_username
+from .models import Account
+from .replica import replica_refresher
+from .state import shared_state
+
+def client_key(request: Request) -> str:
+    return request.cookies.get("session_user") or (request.client.host if request.client else "anonymous")
+
+def get_write_db(request: Request):
+    # Pin this client's reads to the primary until its writes have reached the replica
+    sticky_key = f"read-your-writes:{client_key(request)}"
+    has_replica = database.read_engine is not database.engine
+    window = get_settings().read_your_writes_window
+    if has_replica:
+        shared_state.set(sticky_key, True, ttl=window)
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        if has_replica:
+            shared_state.set(sticky_key, True, ttl=window)
+
+def get_read_db(request: Request):
+    use_primary = (
+        database.read_engine is database.engine
+        or not replica_refresher.ready
+        or shared_state.get(f"read-your-writes:{client_key(request)}", False)
+    )
+    db = SessionLocal() if use_primary else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_current_user(request: Request, db: Session):
+    username = request.cookies.get("session_user")
+    if not username:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    user = account_by_username(db, username)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    return user
+
+def is_admin(user: Account) -> bool:
+    return user.role == "admin"
+
+def is_pharmacist_or_admin(user: Account) -> bool:
+    return user.role in ["pharmacist", "admin"]
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+# Sparse fieldsets: list and detail endpoints take ?fields=id,name,price. Each resource maps
+# its response keys to SQL expressions, so only the requested columns are selected and a
+# narrow view never loads wide columns such as medicines.description.
+
+def parse_fields(fields: Optional[str], field_columns) -> list:
+    # Requested keys in response order; no ?fields= means every key
+    requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+    if not requested:
+        return list(field_columns)
+    unknown = requested - set(field_columns)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in field_columns if name in requested]
+
+def query_fields(db: Session, field_columns: dict, selected: list):
+    return db.query(*[field_columns[name].label(name) for name in selected])
+
+def rows_out(rows, selected: list) -> list:
+    return [{name: getattr(row, name) for name in selected} for row in rows]
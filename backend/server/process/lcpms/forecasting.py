@@ -0,0 +1,108 @@
+import math
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm import Session
+
+from .models import Inventory
+from .sales_archive import sales_tables
+from .purchasing import refresh_purchase_suggestions
+from .schemas import ReorderPointRecompute
+
+# Reorder points from sales history: daily demand per medicine is loaded once into a
+# (medicines x days) matrix and every SKU is forecast in the same NumPy operations.
+# reorder point = expected demand over the lead time + z * sigma * sqrt(lead time)
+
+def load_daily_demand(db: Session, start: date, end: date, medicine_ids: list):
+    # One row per medicine_ids entry (sorted), so medicines without sales get zero demand
+    import numpy as np
+
+    range_start = datetime.combine(start, datetime.min.time())
+    sales, items = sales_tables(db, range_start)
+    day = func.date(sales.c.created_at)
+    rows = db.query(
+        items.c.medicine_id,
+        day,
+        func.sum(items.c.quantity)
+    ).select_from(items).join(sales, sales.c.id == items.c.sale_id).filter(
+        sales.c.status != "refunded",
+        sales.c.created_at >= range_start,
+        sales.c.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+    ).group_by(items.c.medicine_id, day).all()
+
+    n_days = (end - start).days + 1
+    medicine_ids = np.unique(np.array(medicine_ids, dtype=np.int64))
+    demand = np.zeros((len(medicine_ids), n_days), dtype=np.float32)
+    rows = [row for row in rows if row[0] is not None]
+    if not rows or not len(medicine_ids):
+        return medicine_ids, demand
+
+    sold_ids, days, quantities = zip(*rows)
+    sold_ids = np.array(sold_ids, dtype=np.int64)
+    rows_index = np.minimum(np.searchsorted(medicine_ids, sold_ids), len(medicine_ids) - 1)
+    # Sales of medicines that have no inventory left have no reorder point to update
+    tracked = medicine_ids[rows_index] == sold_ids
+    columns = (np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+    demand[rows_index[tracked], columns[tracked]] = np.array(quantities, dtype=np.float32)[tracked]
+    return medicine_ids, demand
+
+def forecast_reorder_points(demand, method: str, window: int, alpha: float, lead_time: float, z: float, min_level: int):
+    import numpy as np
+
+    n_days = demand.shape[1]
+    window = max(1, min(window, n_days))
+    recent = demand[:, -window:]
+
+    if method == "sma":
+        daily = recent.mean(axis=1)
+    else:
+        # Exponential smoothing written as one weighted sum: the newest day gets alpha,
+        # each older day (1 - alpha) times less; weights are renormalised over the history
+        weights = alpha * (1 - alpha) ** np.arange(n_days - 1, -1, -1, dtype=np.float64)
+        daily = demand @ (weights / weights.sum()).astype(np.float32)
+
+    sigma = recent.std(axis=1)
+    reorder_points = np.ceil(daily * lead_time + z * sigma * math.sqrt(lead_time))
+    return np.maximum(reorder_points, min_level).astype(np.int64)
+
+def recompute_reorder_points(db: Session, options: ReorderPointRecompute):
+    started = time.perf_counter()
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=max(1, options.lookbackDays) - 1)
+
+    # Every medicine with stock gets a level, zero-demand ones fall to minLevel
+    stocked = [medicine_id for (medicine_id,) in db.query(Inventory.medicine_id).distinct()]
+    medicine_ids, demand = load_daily_demand(db, start, end, stocked)
+    loaded = time.perf_counter()
+
+    levels = forecast_reorder_points(
+        demand, options.method, options.window, options.alpha,
+        options.leadTimeDays, options.serviceLevelZ, options.minLevel
+    )
+    computed = time.perf_counter()
+
+    # Reorder points are per medicine; every batch of the medicine carries the same level
+    inventory = Inventory.__table__
+    if len(medicine_ids):
+        db.execute(
+            inventory.update()
+            .where(inventory.c.medicine_id == bindparam("target_medicine_id"))
+            .values(min_stock_level=bindparam("level")),
+            [
+                {"target_medicine_id": int(medicine_id), "level": int(level)}
+                for medicine_id, level in zip(medicine_ids, levels)
+            ]
+        )
+    db.commit()
+
+    # Every reorder point may have moved, so every suggestion is stale
+    refresh_purchase_suggestions(db, full=True)
+
+    return {
+        "medicines": int(len(medicine_ids)),
+        "days": int(demand.shape[1]),
+        "loadSeconds": round(loaded - started, 3),
+        "computeSeconds": round(computed - loaded, 3),
+        "writeSeconds": round(time.perf_counter() - computed, 3),
+    }
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import SessionLocal
+from .models import IdempotencyKey
+from .tasks import PeriodicJob
+
+# A retried request carrying the same Idempotency-Key gets the stored response of the
+# first attempt. The key row is claimed before any work is done, so a concurrent
+# duplicate waits for the first request instead of racing it.
+
+idempotency_inflight = {}
+idempotency_lock = threading.Lock()
+
+def request_fingerprint(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def claim_idempotency_key(key: str, request_hash: str):
+    # Returns (status, body) of a completed request, or None once this caller owns the key
+    settings = get_settings()
+    deadline = time.monotonic() + settings.idempotency_wait_timeout
+    while True:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            # Only this key is cleared inline: an expired row, or a claim older than the lock
+            # timeout (its request died mid-flight). Other expired rows go in the cleanup job.
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at < now,
+                    and_(
+                        IdempotencyKey.status == "in_progress",
+                        IdempotencyKey.created_at < now - timedelta(seconds=settings.idempotency_lock_timeout)
+                    )
+                )
+            ).delete()
+            db.commit()
+
+            record = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+            if record is None:
+                db.add(IdempotencyKey(
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=settings.idempotency_ttl),
+                ))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    continue
+                with idempotency_lock:
+                    idempotency_inflight[key] = threading.Event()
+                return None
+
+            if record.request_hash != request_hash:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if record.status == "completed":
+                return record.response_status, json.loads(record.response_body)
+        finally:
+            db.close()
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        with idempotency_lock:
+            waiter = idempotency_inflight.get(key)
+        # Same-process duplicates are woken directly; other workers fall back to polling
+        if waiter:
+            waiter.wait(min(remaining, 1.0))
+        else:
+            time.sleep(min(remaining, 0.05))
+
+def store_idempotent_response(db: Session, key: str, status_code: int, body: dict):
+    # Called inside the request's own transaction so the response is stored only if the work commits
+    db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update({
+        "status": "completed",
+        "response_status": status_code,
+        "response_body": json.dumps(body, default=str),
+    })
+
+def release_idempotency_key(key: str):
+    db = SessionLocal()
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.status == "in_progress"
+    ).delete()
+    db.commit()
+    db.close()
+
+def wake_idempotency_waiters(key: str):
+    with idempotency_lock:
+        waiter = idempotency_inflight.pop(key, None)
+    if waiter:
+        waiter.set()
+
+def purge_expired_idempotency_keys(db: Session):
+    db.query(IdempotencyKey).filter(IdempotencyKey.expires_at < datetime.utcnow()).delete()
+    db.commit()
+
+idempotency_cleanup_job = PeriodicJob("idempotency-cleanup", purge_expired_idempotency_keys)
+
+def start_idempotency_cleanup_job():
+    idempotency_cleanup_job.start(get_settings().idempotency_cleanup_interval)
+
+def stop_idempotency_cleanup_job():
+    idempotency_cleanup_job.stop()
@@ -0,0 +1,142 @@
+from datetime import datetime
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import SessionLocal
+from .models import Inventory, StockMovement, StockSnapshot
+from .state import shared_state
+from .tasks import PeriodicJob
+
+# Every change to Inventory.quantity goes through record_movement so the ledger and the
+# batch quantity are written in the same transaction. Snapshots bound how much of the
+# ledger a point-in-time query has to replay. Once that transaction commits,
+# "stock:<medicine id>" is published for in-memory stock caches.
+MOVEMENT_TYPES = {"receipt", "sale", "refund", "adjustment"}
+
+def record_movement(db: Session, inventory: Inventory, movement_type: str, quantity: int, sale_id: int = None, note: str = None):
+    if movement_type not in MOVEMENT_TYPES:
+        raise ValueError(f"Unknown movement type: {movement_type}")
+
+    if inventory.id is None:
+        db.flush()
+
+    inventory.quantity = (inventory.quantity or 0) + quantity
+    db.info.setdefault("stock_changed", set()).add(inventory.medicine_id)
+    inventory.updated_at = datetime.utcnow()
+    db.add(StockMovement(
+        inventory_id=inventory.id,
+        medicine_id=inventory.medicine_id,
+        movement_type=movement_type,
+        quantity=quantity,
+        sale_id=sale_id,
+        note=note,
+    ))
+
+@event.listens_for(SessionLocal, "after_commit")
+def publish_stock_changes(db):
+    for medicine_id in db.info.pop("stock_changed", ()):
+        shared_state.invalidate(f"stock:{medicine_id}")
+
+@event.listens_for(SessionLocal, "after_rollback")
+def discard_stock_changes(db):
+    db.info.pop("stock_changed", None)
+
+def record_opening_balances(db: Session):
+    # Batches created before the ledger existed get one adjustment carrying their current quantity
+    untracked = db.query(Inventory).filter(
+        ~db.query(StockMovement).filter(StockMovement.inventory_id == Inventory.id).exists()
+    ).all()
+    for inventory in untracked:
+        db.add(StockMovement(
+            inventory_id=inventory.id,
+            medicine_id=inventory.medicine_id,
+            movement_type="adjustment",
+            quantity=inventory.quantity or 0,
+            note="opening balance",
+        ))
+    db.commit()
+    return len(untracked)
+
+def take_stock_snapshots(db: Session):
+    last_movements = db.query(
+        StockMovement.inventory_id,
+        func.max(StockMovement.id).label("movement_id")
+    ).group_by(StockMovement.inventory_id).subquery()
+    last_snapshots = db.query(
+        StockSnapshot.inventory_id,
+        func.max(StockSnapshot.movement_id).label("movement_id")
+    ).group_by(StockSnapshot.inventory_id).subquery()
+
+    # Only batches that moved since their previous snapshot
+    changed = db.query(Inventory, last_movements.c.movement_id).join(
+        last_movements, last_movements.c.inventory_id == Inventory.id
+    ).outerjoin(
+        last_snapshots, last_snapshots.c.inventory_id == Inventory.id
+    ).filter(
+        (last_snapshots.c.movement_id == None) | (last_movements.c.movement_id > last_snapshots.c.movement_id)
+    ).all()
+
+    taken_at = datetime.utcnow()
+    for inventory, movement_id in changed:
+        db.add(StockSnapshot(
+            inventory_id=inventory.id,
+            medicine_id=inventory.medicine_id,
+            quantity=inventory.quantity,
+            movement_id=movement_id,
+            taken_at=taken_at,
+        ))
+    db.commit()
+    return len(changed)
+
+def stock_at(db: Session, as_of: datetime, medicine_id: int = None):
+    latest = db.query(
+        StockSnapshot.inventory_id,
+        func.max(StockSnapshot.id).label("snapshot_id")
+    ).filter(StockSnapshot.taken_at <= as_of).group_by(StockSnapshot.inventory_id).subquery()
+    snapshot = db.query(
+        StockSnapshot.inventory_id,
+        StockSnapshot.medicine_id,
+        StockSnapshot.quantity,
+        StockSnapshot.movement_id
+    ).join(latest, StockSnapshot.id == latest.c.snapshot_id)
+    if medicine_id is not None:
+        snapshot = snapshot.filter(StockSnapshot.medicine_id == medicine_id)
+    snapshot = snapshot.subquery()
+
+    balances = {
+        row.inventory_id: {"medicineId": row.medicine_id, "quantity": row.quantity}
+        for row in db.query(snapshot).all()
+    }
+
+    # Ledger tail: only movements after each batch's snapshot, up to the requested time
+    tail = db.query(
+        StockMovement.inventory_id,
+        StockMovement.medicine_id,
+        func.sum(StockMovement.quantity)
+    ).outerjoin(
+        snapshot, snapshot.c.inventory_id == StockMovement.inventory_id
+    ).filter(
+        StockMovement.created_at <= as_of,
+        StockMovement.id > func.coalesce(snapshot.c.movement_id, 0)
+    )
+    if medicine_id is not None:
+        tail = tail.filter(StockMovement.medicine_id == medicine_id)
+
+    for inventory_id, med_id, delta in tail.group_by(StockMovement.inventory_id, StockMovement.medicine_id).all():
+        balance = balances.setdefault(inventory_id, {"medicineId": med_id, "quantity": 0})
+        balance["quantity"] += delta
+
+    return balances
+
+snapshot_scheduler = PeriodicJob("stock-snapshots", take_stock_snapshots)
+
+def start_snapshot_scheduler():
+    db = SessionLocal()
+    record_opening_balances(db)
+    db.close()
+    snapshot_scheduler.start(get_settings().stock_snapshot_interval)
+
+def stop_snapshot_scheduler():
+    snapshot_scheduler.stop()
@@ -0,0 +1,22 @@
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from .models import Account, Inventory, Medicine
+
+# Single-row lookups that run on nearly every request, built once with bind parameters.
+# A statement rebuilt per call (db.query(...).filter(...)) has to be constructed and
+# walked for its cache key before the compiled cache can be consulted; these constants
+# skip both, see benchmarks/hot_lookups.py.
+
+ACCOUNT_BY_USERNAME = select(Account).where(Account.username == bindparam("username")).limit(1)
+MEDICINE_BY_ID = select(Medicine).where(Medicine.id == bindparam("medicine_id"))
+INVENTORY_BY_MEDICINE = select(Inventory).where(Inventory.medicine_id == bindparam("medicine_id")).limit(1)
+
+def account_by_username(db: Session, username: str):
+    return db.execute(ACCOUNT_BY_USERNAME, {"username": username}).scalars().first()
+
+def medicine_by_id(db: Session, medicine_id: int):
+    return db.execute(MEDICINE_BY_ID, {"medicine_id": medicine_id}).scalars().first()
+
+def inventory_for_medicine(db: Session, medicine_id: int):
+    return db.execute(INVENTORY_BY_MEDICINE, {"medicine_id": medicine_id}).scalars().first()
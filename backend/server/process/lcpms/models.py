@@ -0,0 +1,306 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Float, Boolean, Text, DECIMAL, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from .database import Base
+
+class Account(Base):
+    __tablename__ = "accounts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, unique=True, index=True, nullable=False)
+    password = Column(String, nullable=False)
+    full_name = Column(String, nullable=False)
+    email = Column(String, nullable=False)
+    phone_number = Column(String, nullable=True)
+    address = Column(String, nullable=True)
+    role = Column(String, nullable=False)
+    status = Column(String, default="active")
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False, unique=True)
+    description = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationship
+    medicines = relationship("Medicine", back_populates="category")
+
+class Medicine(Base):
+    __tablename__ = "medicines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    sku = Column(String, nullable=False, unique=True)
+    category_id = Column(Integer, ForeignKey("categories.id"))
+    description = Column(Text, nullable=True)
+    dosage = Column(String, nullable=True)
+    manufacturer = Column(String, nullable=True)
+    price = Column(Float, nullable=False)
+    requires_prescription = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationship
+    category = relationship("Category", back_populates="medicines")
+    inventory_items = relationship("Inventory", back_populates="medicine")
+
+class Inventory(Base):
+    __tablename__ = "inventory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), index=True)
+    quantity = Column(Integer, default=0)
+    min_stock_level = Column(Integer, default=10)
+    batch_number = Column(String, nullable=True)
+    expiry_date = Column(Date, nullable=True)
+    supplier = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    medicine = relationship("Medicine", back_populates="inventory_items")
+
+class Prescription(Base):
+    __tablename__ = "prescriptions"
+    __table_args__ = (
+        # Pharmacist work queue: pending first, oldest first; and per-customer status lookups
+        Index("ix_prescriptions_status_issued_date", "status", "issued_date"),
+        Index("ix_prescriptions_customer_id_status", "customer_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    customer_id = Column(String)
+    customer_name = Column(String)
+
+    pharmacist_id = Column(String) 
+    doctor_name = Column(String) 
+
+    prescription_number = Column(String, unique=True)
+    issued_date = Column(Date)
+    notes = Column(String)
+
+    status = Column(String, default="Active")
+    verified_at = Column(DateTime, nullable=True)
+    dispensed_at = Column(DateTime, nullable=True)
+    doctor_id = Column(Integer, nullable=True)
+
+class Sale(Base):
+    __tablename__ = "sales"
+    # AUTOINCREMENT: archived sales keep their ids, so SQLite must never hand out an id
+    # again once its row has left this table (see sales_archive.py)
+    __table_args__ = (
+        Index("ix_sales_customer_id_created_at", "customer_id", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sale_number = Column(String, unique=True, nullable=False)
+    store_code = Column(String, nullable=True)
+    customer_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)  # Walk-in customers have null
+    pharmacist_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    subtotal = Column(DECIMAL(10, 2), nullable=False)
+    discount_amount = Column(DECIMAL(10, 2), default=0.00)
+    tax_amount = Column(DECIMAL(10, 2), default=0.00)
+    total_amount = Column(DECIMAL(10, 2), nullable=False)
+    payment_method = Column(String, nullable=False)  # cash, card, insurance
+    status = Column(String, default="completed")  # completed, pending, refunded
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    customer = relationship("Account", foreign_keys=[customer_id])
+    pharmacist = relationship("Account", foreign_keys=[pharmacist_id])
+    sale_items = relationship("SaleItem", back_populates="sale", cascade="all, delete-orphan")
+
+class SaleItem(Base):
+    __tablename__ = "sale_items"
+    __table_args__ = (
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(DECIMAL(10, 2), nullable=False)
+    total_price = Column(DECIMAL(10, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    sale = relationship("Sale", back_populates="sale_items")
+    medicine = relationship("Medicine")
+
+class SaleArchive(Base):
+    __tablename__ = "sales_archive"
+    __table_args__ = (
+        Index("ix_sales_archive_created_at", "created_at"),
+        Index("ix_sales_archive_customer_id_created_at", "customer_id", "created_at"),
+    )
+
+    # Cold copy of sales older than the archive age; same columns and ids as sales
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    sale_number = Column(String, unique=True, nullable=False)
+    store_code = Column(String, nullable=True)
+    customer_id = Column(Integer, nullable=True)
+    pharmacist_id = Column(Integer, nullable=False)
+    subtotal = Column(DECIMAL(10, 2), nullable=False)
+    discount_amount = Column(DECIMAL(10, 2), default=0.00)
+    tax_amount = Column(DECIMAL(10, 2), default=0.00)
+    total_amount = Column(DECIMAL(10, 2), nullable=False)
+    payment_method = Column(String, nullable=False)
+    status = Column(String, default="completed")
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class SaleItemArchive(Base):
+    __tablename__ = "sale_items_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    sale_id = Column(Integer, nullable=False, index=True)
+    medicine_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(DECIMAL(10, 2), nullable=False)
+    total_price = Column(DECIMAL(10, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CustomerStats(Base):
+    __tablename__ = "customer_stats"
+
+    # Maintained from sale events; see refresh_customer_stats
+    customer_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    visit_count = Column(Integer, default=0)
+    lifetime_spend = Column(DECIMAL(12, 2), default=0.00)
+    last_visit = Column(DateTime, nullable=True)
+    top_medicines = Column(Text, nullable=True)  # JSON list of {medicineId, name, quantity}
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_type = Column(String, nullable=False)  # end_of_day
+    store_code = Column(String, nullable=False)
+    report_date = Column(Date, nullable=False)
+    status = Column(String, default="pending")  # pending, completed, failed
+    owner = Column(String, nullable=True)  # worker id of the process running it
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+class DailyReport(Base):
+    __tablename__ = "daily_reports"
+    __table_args__ = (
+        UniqueConstraint("report_type", "store_code", "report_date", name="uq_daily_reports_type_store_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_type = Column(String, nullable=False)
+    store_code = Column(String, nullable=False)
+    report_date = Column(Date, nullable=False)
+    payload = Column(Text, nullable=False)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+class ReorderSuggestion(Base):
+    __tablename__ = "reorder_suggestions"
+
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), primary_key=True)
+    supplier = Column(String, nullable=False, index=True)
+    on_hand = Column(Integer, nullable=False)
+    expiring_soon = Column(Integer, nullable=False)
+    daily_demand = Column(Float, nullable=False)
+    reorder_point = Column(Integer, nullable=False)
+    suggested_quantity = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class ReorderRun(Base):
+    __tablename__ = "reorder_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    last_movement_id = Column(Integer, nullable=False)  # ledger position covered by this run
+    run_date = Column(Date, nullable=False)
+    full = Column(Boolean, default=False)
+    medicines = Column(Integer, nullable=True)  # medicines recomputed; null for a full run
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+class TaskOutbox(Base):
+    __tablename__ = "task_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event = Column(String, nullable=False)
+    handler = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String, default="pending", index=True)  # pending, running, failed
+    claimed_by = Column(String, nullable=True)  # worker id while running
+    claimed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (
+        UniqueConstraint("entity", "entity_id", name="uq_change_log_entity"),
+        {"sqlite_autoincrement": True},
+    )
+
+    # Written by triggers (see changes.py); id is the change sequence and each row keeps only
+    # the latest change to its entity, so deletions stay as tombstones
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_inventory_id_id", "inventory_id", "id"),
+        Index("ix_stock_movements_created_at", "created_at"),
+    )
+
+    # Append-only: rows are never updated or deleted
+    id = Column(Integer, primary_key=True, index=True)
+    inventory_id = Column(Integer, nullable=False)
+    medicine_id = Column(Integer, nullable=False)
+    movement_type = Column(String, nullable=False)  # receipt, sale, refund, adjustment
+    quantity = Column(Integer, nullable=False)  # signed change to the batch quantity
+    sale_id = Column(Integer, nullable=True)
+    note = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+    __table_args__ = (
+        Index("ix_stock_snapshots_inventory_id_taken_at", "inventory_id", "taken_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    inventory_id = Column(Integer, nullable=False)
+    medicine_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    movement_id = Column(Integer, nullable=False)  # last movement included in quantity
+    taken_at = Column(DateTime, default=datetime.utcnow)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)  # "<account id>:<Idempotency-Key header>"
+    request_hash = Column(String, nullable=False)
+    status = Column(String, default="in_progress")  # in_progress, completed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class SaleNumberSequence(Base):
+    __tablename__ = "sale_number_sequences"
+
+    store_code = Column(String, primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)  # first number not yet reserved by any worker
@@ -0,0 +1,226 @@
+import cProfile
+import contextvars
+import functools
+import inspect
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter
+
+from .config import get_settings
+from .request_queue import request_queue
+from .state import shared_state
+
+# Admin-only profiling, installed by create_app only when PROFILING is on; otherwise no
+# middleware or wrapper exists and requests pay nothing.
+#
+# - A request from an admin session with "X-Profile: cprofile" or "X-Profile: sample" runs
+#   its handler under cProfile or a stack sampler. The report is written to profile_dir
+#   and named in the X-Profile-Result response header. For async endpoints both modes use
+#   cProfile on the event loop thread, which records every coroutine that runs there, so
+#   the profile is only kept when no other request was in flight in this worker from start
+#   to finish; otherwise the response says why in X-Profile-Skipped. It also does not see
+#   work handed to the threadpool (run_in_threadpool in /api/medicines/import); profile
+#   those with the sampling run.
+# - POST /api/admin/profiling/sample samples every thread for a few seconds and writes
+#   the stacks in collapsed form ("frame;frame;frame count"), which flamegraph.pl and
+#   speedscope read directly.
+
+logger = logging.getLogger(__name__)
+PROFILE_MODES = {"cprofile", "sample"}
+profile_request = contextvars.ContextVar("profile_request", default=None)
+
+def frame_label(frame) -> str:
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+def collapsed_stack(frame, root: str) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join([root] + labels[::-1])
+
+class StackSampler:
+    # Samples the stacks of thread_ids (None: every other thread) every interval seconds
+    def __init__(self, interval: float, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self.stopping = threading.Event()
+        self.begun = threading.Event()
+        self.thread = None
+
+    def start(self, begin: bool = True):
+        # begin=False: the caller sets self.begun right before the code it wants sampled
+        self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+        self.thread.start()
+        if begin:
+            self.begun.set()
+
+    def stop(self):
+        self.stopping.set()
+        self.begun.set()
+        self.thread.join()
+
+    def run(self):
+        # The first sample is taken as soon as sampling begins, so a call shorter than one
+        # interval still leaves a stack
+        own_id = threading.get_ident()
+        self.begun.wait()
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self.stacks[collapsed_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+            if self.stopping.wait(self.interval):
+                break
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def write_profile(kind: str, content: str) -> str:
+    settings = get_settings()
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    extension = "txt" if kind == "cprofile" else "folded"
+    name = f"{kind}-{datetime.utcnow():%Y%m%d-%H%M%S-%f}.{extension}"
+    with open(os.path.join(settings.profile_dir, name), "w") as f:
+        f.write(content)
+    return name
+
+def run_profiled(func, args, kwargs, request_profile: dict):
+    if request_profile["mode"] == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(60)
+            request_profile["result"] = write_profile("cprofile", report.getvalue())
+
+    sampler = StackSampler(get_settings().profile_sample_interval, {threading.get_ident()})
+    sampler.start(begin=False)
+    try:
+        sampler.begun.set()
+        return func(*args, **kwargs)
+    finally:
+        sampler.stop()
+        request_profile["result"] = write_profile("request", sampler.collapsed())
+
+def profiled(func):
+    # Endpoint wrapper: profiles the call when the middleware marked this request. Sync
+    # handlers run in a worker thread; the context variable is copied into it.
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            request_profile = profile_request.get()
+            if request_profile is None:
+                return await func(*args, **kwargs)
+            # Only cProfile can follow a coroutine, and it sees the whole loop: refuse to
+            # profile next to other requests rather than attribute their work to this one
+            if request_queue.in_flight > 1:
+                request_profile["skipped"] = f"{request_queue.in_flight - 1} other requests in flight"
+                return await func(*args, **kwargs)
+            admitted = request_queue.admitted
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                if request_queue.admitted != admitted:
+                    request_profile["skipped"] = "other requests started while profiling"
+                else:
+                    report = io.StringIO()
+                    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(60)
+                    request_profile["result"] = write_profile("cprofile", report.getvalue())
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        request_profile = profile_request.get()
+        if request_profile is None:
+            return func(*args, **kwargs)
+        return run_profiled(func, args, kwargs, request_profile)
+    return wrapper
+
+def profiled_router(router: APIRouter) -> APIRouter:
+    # A copy of router whose endpoints are wrapped by profiled(); the module-level routers
+    # stay untouched so an app built with profiling off serves the plain functions
+    copy = APIRouter()
+    for route in router.routes:
+        copy.add_api_route(
+            route.path,
+            profiled(route.endpoint),
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            response_class=route.response_class,
+            tags=route.tags,
+            name=route.name,
+        )
+    return copy
+
+def is_admin_session(request) -> bool:
+    session_user = request.cookies.get("session_user")
+    session = shared_state.get(f"session:{session_user}") if session_user else None
+    return bool(session) and session.get("role") == "admin"
+
+async def profile_requests(request, call_next):
+    mode = request.headers.get("x-profile")
+    if mode not in PROFILE_MODES or not is_admin_session(request):
+        return await call_next(request)
+
+    request_profile = {"mode": mode, "result": None, "skipped": None}
+    token = profile_request.set(request_profile)
+    try:
+        response = await call_next(request)
+    finally:
+        profile_request.reset(token)
+    if request_profile["result"]:
+        response.headers["X-Profile-Result"] = request_profile["result"]
+    if request_profile["skipped"]:
+        response.headers["X-Profile-Skipped"] = request_profile["skipped"]
+    return response
+
+sampling_lock = threading.Lock()
+
+def sample_all_threads(seconds: float) -> str:
+    # Blocks for seconds; one time-boxed sampling run at a time
+    settings = get_settings()
+    if not sampling_lock.acquire(blocking=False):
+        raise RuntimeError("A sampling run is already in progress")
+    try:
+        sampler = StackSampler(settings.profile_sample_interval)
+        sampler.start()
+        time.sleep(min(seconds, settings.profile_max_seconds))
+        sampler.stop()
+        name = write_profile("sample", sampler.collapsed())
+        logger.info("Wrote %s (%s distinct stacks)", name, len(sampler.stacks))
+        return name
+    finally:
+        sampling_lock.release()
+
+def list_profiles(profile_dir: str) -> list:
+    if not os.path.isdir(profile_dir):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(profile_dir), reverse=True):
+        path = os.path.join(profile_dir, name)
+        profiles.append({"name": name, "size": os.path.getsize(path), "createdAt": datetime.utcfromtimestamp(os.path.getmtime(path))})
+    return profiles
+
+def read_profile(profile_dir: str, name: str) -> Optional[str]:
+    # Only bare file names written by write_profile; anything else is treated as missing
+    if not os.path.isdir(profile_dir) or name not in os.listdir(profile_dir):
+        return None
+    with open(os.path.join(profile_dir, name)) as f:
+        return f.read()
@@ -0,0 +1,113 @@
+import math
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import Inventory, ReorderRun, ReorderSuggestion, Sale, SaleItem, StockMovement
+from .tasks import PeriodicJob
+
+# Supplier-grouped reorder suggestions, kept in reorder_suggestions. Each run only
+# recomputes medicines whose stock moved since the previous run (read from the stock
+# ledger), or whose batches entered the expiry horizon or expired since then.
+def touched_medicine_ids(db: Session, last_run: ReorderRun, today: date):
+    horizon = timedelta(days=get_settings().po_expiry_horizon_days)
+    moved = db.query(StockMovement.medicine_id).filter(
+        StockMovement.id > last_run.last_movement_id
+    ).distinct()
+    # Lots already inside the horizon at the last run were counted then; only the window
+    # edges moved: (last run + horizon, today + horizon] entered it and
+    # (last run, today] stopped being usable stock
+    expiring = db.query(Inventory.medicine_id).filter(or_(
+        and_(Inventory.expiry_date > last_run.run_date + horizon, Inventory.expiry_date <= today + horizon),
+        and_(Inventory.expiry_date > last_run.run_date, Inventory.expiry_date <= today),
+    )).distinct()
+    return {medicine_id for (medicine_id,) in moved.union(expiring).all()}
+
+def compute_reorder_suggestions(db: Session, medicine_ids):
+    settings = get_settings()
+    today = datetime.utcnow().date()
+    horizon = today + timedelta(days=settings.po_expiry_horizon_days)
+    id_filter = [] if medicine_ids is None else [Inventory.medicine_id.in_(medicine_ids)]
+
+    stock = db.query(
+        Inventory.medicine_id,
+        func.coalesce(func.sum(Inventory.quantity).filter(
+            or_(Inventory.expiry_date == None, Inventory.expiry_date > today)
+        ), 0),
+        func.coalesce(func.sum(Inventory.quantity).filter(
+            Inventory.expiry_date > today, Inventory.expiry_date <= horizon
+        ), 0),
+        func.max(Inventory.min_stock_level)
+    ).filter(*id_filter).group_by(Inventory.medicine_id).all()
+
+    demand_since = datetime.utcnow() - timedelta(days=settings.po_demand_window_days)
+    demand_query = db.query(SaleItem.medicine_id, func.sum(SaleItem.quantity)).join(
+        Sale, Sale.id == SaleItem.sale_id
+    ).filter(Sale.status != "refunded", Sale.created_at >= demand_since)
+    if medicine_ids is not None:
+        demand_query = demand_query.filter(SaleItem.medicine_id.in_(medicine_ids))
+    demand = {
+        medicine_id: quantity / settings.po_demand_window_days
+        for medicine_id, quantity in demand_query.group_by(SaleItem.medicine_id).all()
+    }
+
+    # Supplier of each medicine's most recent batch
+    latest_batch = db.query(
+        Inventory.medicine_id,
+        func.max(Inventory.id).label("inventory_id")
+    ).filter(Inventory.supplier != None, *id_filter).group_by(Inventory.medicine_id).subquery()
+    suppliers = dict(db.query(Inventory.medicine_id, Inventory.supplier).join(
+        latest_batch, latest_batch.c.inventory_id == Inventory.id
+    ).all())
+
+    suggestions = []
+    for medicine_id, on_hand, expiring_soon, reorder_point in stock:
+        usable = on_hand - expiring_soon
+        daily_demand = demand.get(medicine_id, 0.0)
+        if usable > reorder_point:
+            continue
+        suggestions.append(ReorderSuggestion(
+            medicine_id=medicine_id,
+            supplier=suppliers.get(medicine_id) or "Unassigned",
+            on_hand=on_hand,
+            expiring_soon=expiring_soon,
+            daily_demand=round(daily_demand, 3),
+            reorder_point=reorder_point,
+            suggested_quantity=max(1, math.ceil(reorder_point + daily_demand * settings.po_cover_days - usable)),
+        ))
+    return suggestions
+
+def refresh_purchase_suggestions(db: Session, full: bool = False):
+    today = datetime.utcnow().date()
+    last_run = db.query(ReorderRun).filter(ReorderRun.finished_at != None).order_by(ReorderRun.id.desc()).first()
+    # Taken before reading stock, so movements committed during the run are picked up next time
+    last_movement_id = db.query(func.coalesce(func.max(StockMovement.id), 0)).scalar()
+
+    full = full or last_run is None
+    medicine_ids = None if full else touched_medicine_ids(db, last_run, today)
+    run = ReorderRun(last_movement_id=last_movement_id, run_date=today, full=full)
+    db.add(run)
+
+    if full:
+        db.query(ReorderSuggestion).delete()
+    elif medicine_ids:
+        db.query(ReorderSuggestion).filter(ReorderSuggestion.medicine_id.in_(medicine_ids)).delete(synchronize_session=False)
+
+    if full or medicine_ids:
+        db.add_all(compute_reorder_suggestions(db, medicine_ids))
+
+    run.medicines = None if full else len(medicine_ids)
+    run.finished_at = datetime.utcnow()
+    db.query(ReorderRun).filter(ReorderRun.started_at < datetime.utcnow() - timedelta(days=30)).delete()
+    db.commit()
+    return {"full": full, "medicinesRecomputed": None if full else len(medicine_ids)}
+
+purchase_suggestion_job = PeriodicJob("purchase-suggestions", refresh_purchase_suggestions)
+
+def start_purchase_suggestion_job():
+    purchase_suggestion_job.start(get_settings().po_refresh_interval)
+
+def stop_purchase_suggestion_job():
+    purchase_suggestion_job.stop()
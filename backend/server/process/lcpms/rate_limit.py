@@ -0,0 +1,151 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import anyio
+import anyio.to_thread
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from .config import Settings
+from .state import shared_state
+
+# Requests are classified by route; each class has a token bucket per client (confirmed
+# session user, else IP; logins always by IP) and optionally a cap on concurrent requests
+# across the worker. Buckets live in an LRU keyed by (class, client): a check is O(1) and
+# idle keys are evicted from the cold end. Limits are per worker process. Override with Settings.rate_limits (RATE_LIMITS),
+# e.g. RATE_LIMITS='{"auth": {"rate": 0.2, "burst": 5}}'.
+ROUTE_CLASS_LIMITS = {
+    "auth": {"rate": 0.5, "burst": 10},
+    "login_account": {"rate": 0.1, "burst": 5},
+    "polling": {"rate": 5, "burst": 20},
+    "heavy": {"rate": 0.5, "burst": 5, "concurrency": 4},
+    "default": {"rate": 20, "burst": 50},
+}
+
+# (method or None for any, path prefix, class); first match wins
+ROUTE_CLASSES = [
+    ("POST", "/api/auth/login", "auth"),
+    ("POST", "/api/auth/register", "auth"),
+    (None, "/api/medicines/import", "heavy"),
+    ("POST", "/api/reports/", "heavy"),
+    ("GET", "/api/reports/", "polling"),
+    (None, "/api/inventory/reorder-points/", "heavy"),
+    (None, "/api/inventory/stock-at", "heavy"),
+    (None, "/api/purchase-orders/suggestions/refresh", "heavy"),
+    ("POST", "/api/admin/backups", "heavy"),
+    ("POST", "/api/admin/profiling/", "heavy"),
+    ("GET", "/api/sales", "polling"),
+    ("GET", "/api/sync", "polling"),
+    ("GET", "/api/dashboard/", "polling"),
+    ("GET", "/api/inventory", "polling"),
+]
+
+def classify_route(method: str, path: str) -> str:
+    for route_method, prefix, route_class in ROUTE_CLASSES:
+        if (route_method is None or route_method == method) and path.startswith(prefix):
+            return route_class
+    return "default"
+
+class TokenBucketLimiter:
+    def __init__(self, limits: dict, idle_seconds: float, max_keys: int):
+        self.limits = limits
+        self.idle_seconds = idle_seconds
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()  # (class, key) -> [tokens, last refill]; least recently used first
+
+    def acquire(self, route_class: str, key: str) -> float:
+        # Returns 0 when a token was taken, otherwise seconds until one is available
+        limit = self.limits[route_class]
+        rate, burst = limit["rate"], limit["burst"]
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.pop((route_class, key), None)
+            if bucket is None:
+                bucket = [burst, now]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            self.buckets[(route_class, key)] = bucket
+
+            # Evict from the cold end: at most a couple of entries per call on average
+            while self.buckets:
+                oldest_key, oldest = next(iter(self.buckets.items()))
+                if len(self.buckets) <= self.max_keys and now - oldest[1] < self.idle_seconds:
+                    break
+                del self.buckets[oldest_key]
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+rate_limiter = None
+concurrency_limits = {}
+
+def configure_rate_limits(settings: Settings):
+    global rate_limiter, concurrency_limits
+    limits = {route_class: dict(limit) for route_class, limit in ROUTE_CLASS_LIMITS.items()}
+    for route_class, overrides in settings.rate_limits.items():
+        limits.setdefault(route_class, {}).update(overrides)
+
+    rate_limiter = TokenBucketLimiter(limits, settings.rate_limit_idle_seconds, settings.rate_limit_max_keys)
+    concurrency_limits = {
+        route_class: threading.BoundedSemaphore(limit["concurrency"])
+        for route_class, limit in limits.items()
+        if limit.get("concurrency")
+    }
+
+def rate_limited_response(retry_after: float, detail: str = "Too many requests"):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+def check_account_rate(route_class: str, account_key: str):
+    retry_after = rate_limiter.acquire(route_class, account_key)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts for this account",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+# Session lookups get their own threads: admission control runs before queue_requests, and
+# the default thread limiter is sized to the handlers already in flight
+session_lookup_limiter = anyio.CapacityLimiter(8)
+
+async def rate_limit_key(request: Request, route_class: str) -> str:
+    # The session_user cookie is client-chosen: only a session that exists in shared_state
+    # earns a per-user bucket. Logins and everything unauthenticated are keyed on the
+    # client address, so rotating cookies does not buy fresh buckets. The lookup may hit
+    # SQLite or Redis, so it runs off the event loop.
+    if route_class != "auth":
+        session_user = request.cookies.get("session_user")
+        if session_user and await anyio.to_thread.run_sync(
+            shared_state.get, f"session:{session_user}", limiter=session_lookup_limiter
+        ):
+            return f"user:{session_user}"
+    return f"ip:{request.client.host if request.client else 'anonymous'}"
+
+async def admission_control(request: Request, call_next):
+    route_class = classify_route(request.method, request.url.path)
+
+    retry_after = rate_limiter.acquire(route_class, await rate_limit_key(request, route_class))
+    if retry_after:
+        return rate_limited_response(retry_after)
+
+    # Heavy routes fail fast when the worker is already busy with enough of them
+    semaphore = concurrency_limits.get(route_class)
+    if semaphore is None:
+        return await call_next(request)
+    if not semaphore.acquire(blocking=False):
+        return JSONResponse(status_code=503, content={"detail": "Server busy, retry shortly"}, headers={"Retry-After": "1"})
+    try:
+        return await call_next(request)
+    finally:
+        semaphore.release()
@@ -0,0 +1,79 @@
+import logging
+import os
+import sqlite3
+import threading
+
+from .backups import BackupTimedOut, copy_database
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class ReplicaRefresher:
+    # Copies data.db into the replica file in small page steps so writers are only
+    # blocked for one step at a time, then swaps the finished copy into place. Each worker
+    # process stages its copy under its own name, and a refresh is skipped while
+    # PRAGMA data_version shows no commit to data.db since the last one.
+    def __init__(self, pages: int = 256):
+        self.pages = pages
+        self.stopping = threading.Event()
+        self.thread = None
+        self.ready = False
+        self.monitor = None
+        self.copied_version = None
+
+    def data_version(self) -> int:
+        # Changes whenever another connection commits; the monitor connection itself never writes
+        if self.monitor is None:
+            self.monitor = sqlite3.connect(get_settings().database_path, check_same_thread=False)
+        return self.monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self):
+        settings = get_settings()
+        version = self.data_version()
+        if version == self.copied_version and os.path.exists(settings.replica_path):
+            return
+        staging_path = f"{settings.replica_path}.{os.getpid()}.tmp"
+        try:
+            stats = copy_database(
+                settings.database_path, staging_path, self.pages, 0.001,
+                settings.backup_max_restarts, settings.replica_refresh_max_seconds
+            )
+        except Exception:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+            raise
+        os.replace(staging_path, settings.replica_path)
+        self.copied_version = version
+        self.ready = True
+        logger.debug("Replica refreshed: %s pages, %s restarts", stats["pages"], stats["restarts"])
+
+    def start(self):
+        settings = get_settings()
+        self.ready = settings.read_replica == "url"
+        if settings.read_replica != "sqlite":
+            return
+        self.refresh()
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, args=(settings.replica_refresh_interval,), name="replica-refresh", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=30)
+            self.thread = None
+        if self.monitor is not None:
+            self.monitor.close()
+            self.monitor = None
+        self.copied_version = None
+
+    def run(self, interval: float):
+        while not self.stopping.wait(interval):
+            try:
+                self.refresh()
+            except BackupTimedOut as e:
+                logger.warning("Replica refresh gave up, keeping the previous copy: %s", e)
+            except Exception:
+                logger.exception("Replica refresh failed")
+
+replica_refresher = ReplicaRefresher()
@@ -0,0 +1,221 @@
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, or_, select
+from sqlalchemy.pool import NullPool
+
+from .config import get_settings
+from .database import SessionLocal
+from .models import Account, Category, DailyReport, Medicine, ReportJob
+from .sales_archive import sales_tables
+from .tasks import WORKER_ID
+
+# End-of-day reports run in a process pool so aggregation never competes with request
+# threads for the GIL. Workers stream the day's rows in chunks from their own connection;
+# finished reports are cached in daily_reports by (store, date).
+
+logger = logging.getLogger(__name__)
+report_executor = None
+report_executor_lock = threading.Lock()
+
+def get_report_executor():
+    global report_executor
+    with report_executor_lock:
+        if report_executor is None:
+            # spawn: never fork a process that is running worker threads
+            report_executor = ProcessPoolExecutor(max_workers=get_settings().report_workers, mp_context=multiprocessing.get_context("spawn"))
+        return report_executor
+
+def discard_report_executor(broken: ProcessPoolExecutor):
+    # A pool whose worker died (OOM kill, segfault) rejects every submit; the next
+    # get_report_executor builds a fresh one
+    global report_executor
+    with report_executor_lock:
+        if report_executor is broken:
+            report_executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def submit_report(fn, *args):
+    # Retries once on a fresh pool; raises BrokenProcessPool if that one is broken too
+    for attempt in range(2):
+        executor = get_report_executor()
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Report process pool is broken; starting a new one")
+            discard_report_executor(executor)
+            if attempt:
+                raise
+
+def build_end_of_day_report(database_url: str, store_code: str, report_date: date, include_unassigned: bool, chunk_size: int):
+    # Runs in a worker process, which imports this module only, not the app
+    report_engine = create_engine(database_url, poolclass=NullPool)
+    day_start = datetime.combine(report_date, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    # Days older than the newest archived sale are read through the archive union
+    with report_engine.connect() as conn:
+        sales, items = sales_tables(conn, day_start)
+    store_filter = sales.c.store_code == store_code
+    if include_unassigned:
+        # Sales recorded before store codes existed belong to the default store
+        store_filter = or_(store_filter, sales.c.store_code == None)
+    day_filter = (sales.c.created_at >= day_start, sales.c.created_at < day_end, store_filter)
+
+    def money(value):
+        return round(float(value or 0), 2)
+
+    totals = {"salesCount": 0, "refundedCount": 0, "subtotal": 0.0, "discount": 0.0, "tax": 0.0, "total": 0.0, "refundedTotal": 0.0}
+    by_payment = {}
+    by_pharmacist = {}
+    by_category = {}
+
+    with report_engine.connect() as conn:
+        sale_rows = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            select(
+                sales.c.payment_method, sales.c.pharmacist_id, sales.c.status,
+                sales.c.subtotal, sales.c.discount_amount, sales.c.tax_amount, sales.c.total_amount
+            ).where(*day_filter)
+        )
+        for chunk in sale_rows.partitions():
+            for payment_method, pharmacist_id, sale_status, subtotal, discount, tax, total in chunk:
+                if sale_status == "refunded":
+                    totals["refundedCount"] += 1
+                    totals["refundedTotal"] += money(total)
+                    continue
+                totals["salesCount"] += 1
+                totals["subtotal"] += money(subtotal)
+                totals["discount"] += money(discount)
+                totals["tax"] += money(tax)
+                totals["total"] += money(total)
+
+                payment = by_payment.setdefault(payment_method, {"count": 0, "total": 0.0, "tax": 0.0})
+                payment["count"] += 1
+                payment["total"] += money(total)
+                payment["tax"] += money(tax)
+
+                pharmacist = by_pharmacist.setdefault(pharmacist_id, {"count": 0, "total": 0.0})
+                pharmacist["count"] += 1
+                pharmacist["total"] += money(total)
+
+        medicines = Medicine.__table__
+        categories = Category.__table__
+        item_rows = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            select(categories.c.name, items.c.quantity, items.c.total_price)
+            .select_from(
+                items.join(sales, sales.c.id == items.c.sale_id)
+                .outerjoin(medicines, medicines.c.id == items.c.medicine_id)
+                .outerjoin(categories, categories.c.id == medicines.c.category_id)
+            )
+            .where(*day_filter, sales.c.status != "refunded")
+        )
+        for chunk in item_rows.partitions():
+            for category_name, quantity, total_price in chunk:
+                category = by_category.setdefault(category_name or "Uncategorized", {"quantity": 0, "total": 0.0})
+                category["quantity"] += quantity
+                category["total"] += money(total_price)
+
+        accounts = Account.__table__
+        pharmacist_names = dict(conn.execute(
+            select(accounts.c.id, accounts.c.full_name).where(accounts.c.id.in_(list(by_pharmacist)))
+        ).all()) if by_pharmacist else {}
+
+    report_engine.dispose()
+
+    def rounded(values):
+        return {key: round(value, 2) if isinstance(value, float) else value for key, value in values.items()}
+
+    return {
+        "storeCode": store_code,
+        "date": report_date.isoformat(),
+        "totals": rounded(totals),
+        "byPaymentMethod": {method: rounded(values) for method, values in by_payment.items()},
+        "byPharmacist": [
+            dict(rounded(values), pharmacistId=pharmacist_id, pharmacistName=pharmacist_names.get(pharmacist_id, "Unknown"))
+            for pharmacist_id, values in by_pharmacist.items()
+        ],
+        "byCategory": {name: rounded(values) for name, values in by_category.items()},
+    }
+
+def finish_report_job(job_id: int, future):
+    # Runs in the parent process when the worker process is done
+    db = SessionLocal()
+    try:
+        job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        try:
+            report = future.result()
+        except Exception as e:
+            logger.exception("Report job %s failed", job_id)
+            job.status = "failed"
+            job.error = repr(e)
+        else:
+            cached = db.query(DailyReport).filter(
+                DailyReport.report_type == job.report_type,
+                DailyReport.store_code == job.store_code,
+                DailyReport.report_date == job.report_date
+            ).first()
+            if not cached:
+                cached = DailyReport(report_type=job.report_type, store_code=job.store_code, report_date=job.report_date)
+                db.add(cached)
+            cached.payload = json.dumps(report)
+            cached.generated_at = datetime.utcnow()
+            job.status = "completed"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+def report_job_out(job: ReportJob):
+    return {
+        "id": job.id,
+        "reportType": job.report_type,
+        "storeCode": job.store_code,
+        "date": job.report_date,
+        "status": job.status,
+        "error": job.error,
+        "createdAt": job.created_at,
+        "finishedAt": job.finished_at,
+    }
+
+def report_job_lost(job: ReportJob) -> bool:
+    # Pending jobs belong to the process that submitted them; other worker processes'
+    # jobs are only given up on when that process is gone from this host or the lease ran out
+    if job.created_at < datetime.utcnow() - timedelta(seconds=get_settings().report_job_lease):
+        return True
+    host, _, pid = (job.owner or "").rpartition(":")
+    if job.owner == WORKER_ID or host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+def fail_interrupted_report_jobs():
+    # Pending jobs whose process died will never finish; let callers resubmit them
+    db = SessionLocal()
+    try:
+        for job in db.query(ReportJob).filter(ReportJob.status == "pending"):
+            if report_job_lost(job):
+                job.status = "failed"
+                job.error = "Interrupted: its worker process is gone"
+                job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+def stop_report_executor():
+    global report_executor
+    with report_executor_lock:
+        if report_executor is not None:
+            report_executor.shutdown(wait=False, cancel_futures=True)
+            report_executor = None
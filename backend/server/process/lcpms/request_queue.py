@@ -0,0 +1,86 @@
+import time
+from collections import deque
+
+import anyio
+import anyio.to_thread
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from . import database
+from .config import get_settings
+
+# At most worker_threads requests are in flight; the rest wait here, where the queue is
+# visible, instead of inside AnyIO's thread limiter. A request that waits longer than
+# queue_deadline is shed with 503 since the client has likely given up by then.
+QUEUE_WAIT_SAMPLES = 1000
+
+class RequestQueue:
+    def __init__(self):
+        self.slots = 0
+        self.deadline = 0
+        self.semaphore = None  # created on the event loop at startup
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.waits = deque(maxlen=QUEUE_WAIT_SAMPLES)
+
+    def start(self):
+        settings = get_settings()
+        self.slots = settings.worker_threads
+        self.deadline = settings.queue_deadline
+        self.semaphore = anyio.Semaphore(self.slots)
+        anyio.to_thread.current_default_thread_limiter().total_tokens = self.slots
+
+    async def acquire(self) -> bool:
+        started = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            with anyio.move_on_after(self.deadline):
+                await self.semaphore.acquire()
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            self.shed += 1
+            return False
+        finally:
+            self.waiting -= 1
+            self.waits.append(time.monotonic() - started)
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def stats(self) -> dict:
+        waits = sorted(self.waits)
+
+        def percentile(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else 0
+
+        return {
+            "workerThreads": self.slots,
+            "dbPoolSize": database.engine.pool.size(),
+            "dbConnectionsCheckedOut": database.engine.pool.checkedout(),
+            "queueDepth": self.waiting,
+            "maxQueueDepth": self.max_waiting,
+            "inFlight": self.in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "queueDeadlineSeconds": self.deadline,
+            "waitMs": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99), "max": percentile(1)},
+        }
+
+request_queue = RequestQueue()
+
+async def start_request_queue():
+    request_queue.start()
+
+async def queue_requests(request: Request, call_next):
+    if not await request_queue.acquire():
+        return JSONResponse(status_code=503, content={"detail": "Server overloaded, retry shortly"}, headers={"Retry-After": "1"})
+    try:
+        return await call_next(request)
+    finally:
+        request_queue.release()
@@ -0,0 +1,219 @@
+import json
+from typing import Optional
+
+import bcrypt
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..batch import fetch_in_order, parse_ids
+from ..customer_index import customer_index
+from ..deps import get_current_user, get_read_db, get_write_db, is_pharmacist_or_admin
+from ..fields import parse_fields, query_fields, rows_out
+from ..lookups import account_by_username
+from ..models import Account, CustomerStats, Sale, SaleItem
+from ..sales_archive import sales_out, sales_tables, select_sales
+from ..schemas import RegisterData, UpdateCustomerData
+from ..state import shared_state
+
+router = APIRouter()
+
+PURCHASE_FIELDS = ["id", "saleNumber", "totalAmount", "paymentMethod", "status", "createdAt", "items"]
+
+USER_FIELDS = {
+    "id": Account.id,
+    "username": Account.username,
+    "email": Account.email,
+    "fullName": Account.full_name,
+    "phone": Account.phone_number,
+    "address": Account.address,
+    "role": Account.role,
+    "isActive": Account.status == "active",
+    "createdAt": Account.created_at,
+}
+
+@router.put("/api/accounts/{target_username}/state")
+def state_change_account(target_username: str, db: Session = Depends(get_write_db), request: Request = None):
+    session_user = request.cookies.get("session_user")
+    current = account_by_username(db, session_user)
+    if not current or current.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admin can toggle status")
+
+    account = account_by_username(db, target_username)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    if account.role == "admin":
+        raise HTTPException(status_code=403, detail="Cannot change status of admin accounts")
+
+    account.status = "suspended" if account.status == "active" else "active"
+    db.commit()
+    shared_state.invalidate(f"account:{account.id}")
+
+    return {"message": f"Account status changed to {account.status}"}
+    
+@router.post("/api/users")
+def create_customer(data: RegisterData, db: Session = Depends(get_write_db), request: Request = None):
+    session_user = request.cookies.get("session_user") if request else None
+    if session_user:
+        current = account_by_username(db, session_user)
+        if not current or current.role != "admin":
+            raise HTTPException(status_code=403, detail="Only admin can create customer accounts")
+
+    if account_by_username(db, data.username):
+        raise HTTPException(status_code=400, detail="Username already exists")
+    if db.query(Account).filter(Account.email == data.email).first():
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    if data.role != "customer":
+        raise HTTPException(status_code=400, detail="Only 'customer' accounts can be created here")
+
+    hashed_pw = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
+
+    customer = Account(
+        username=data.username,
+        password=hashed_pw,
+        email=data.email,
+        full_name=data.fullName,
+        phone_number=data.phone,
+        address=data.address,
+        role="customer",
+        status="active"
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    shared_state.invalidate(f"account:{customer.id}")
+
+    return {"message": "Customer account created", "id": customer.id}
+
+@router.put("/api/users/{user_id}")
+def update_customer(user_id: int, data: UpdateCustomerData, db: Session = Depends(get_write_db), request: Request = None):
+    session_user = request.cookies.get("session_user")
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    current = account_by_username(db, session_user)
+    if not current or current.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admin can update customer info")
+
+    customer = db.query(Account).filter(Account.id == user_id, Account.role == "customer").first()
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    customer.full_name = data.fullName
+    customer.email = data.email
+    customer.phone_number = data.phone
+    customer.address = data.address
+
+    db.commit()
+    db.refresh(customer)
+    shared_state.invalidate(f"account:{customer.id}")
+
+    return {"message": "Customer updated successfully"}
+
+@router.get("/api/users")
+def get_users(
+    role: Optional[str] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    selected = parse_fields(fields, USER_FIELDS)
+    query = query_fields(db, USER_FIELDS, selected if ids is None else list(dict.fromkeys(["id"] + selected)))
+    if role:
+        query = query.filter(Account.role == role)
+    if ids is None:
+        return rows_out(query.all(), selected)
+
+    rows = fetch_in_order(parse_ids(ids), lambda chunk: query.filter(Account.id.in_(chunk)).all())
+    return rows_out(rows, selected)
+
+@router.get("/api/users/lookup")
+def lookup_customers(q: str, request: Request, limit: int = 10, db: Session = Depends(get_read_db)):
+    # Till typeahead: prefix match on name words, username, email or phone digits
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can look up customers")
+    return customer_index.lookup(q, max(1, min(limit, 50)))
+
+@router.get("/api/users/{user_id}/purchases")
+def get_customer_purchases(user_id: int, request: Request, limit: int = 20, offset: int = 0, db: Session = Depends(get_read_db)):
+    current_user = get_current_user(request, db)
+    if current_user.id != user_id and not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Customers can only view their own purchases")
+
+    customer = db.query(Account).filter(Account.id == user_id, Account.role == "customer").first()
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    limit = max(1, min(limit, 100))
+
+    # Served by ix_sales_customer_id_created_at (and its archive twin). Archived sales are
+    # all older than hot ones, so a page is read from the hot table first and only a short
+    # page, one that ran past the customer's hot sales, is read again with the archive
+    def purchase_rows(sales):
+        return db.execute(
+            select_sales(sales, PURCHASE_FIELDS).where(sales.c.customer_id == user_id)
+            .order_by(sales.c.created_at.desc(), sales.c.id.desc()).offset(offset).limit(limit)
+        ).all()
+
+    sales, items = Sale.__table__, SaleItem.__table__
+    sale_rows = purchase_rows(sales)
+    if len(sale_rows) < limit:
+        all_sales, all_items = sales_tables(db)
+        if all_sales is not sales:
+            sales, items = all_sales, all_items
+            sale_rows = purchase_rows(sales)
+
+    stats = db.query(CustomerStats).filter(CustomerStats.customer_id == user_id).first()
+
+    return {
+        "customerId": customer.id,
+        "customerName": customer.full_name,
+        "summary": {
+            "visitCount": stats.visit_count if stats else 0,
+            "lifetimeSpend": float(stats.lifetime_spend) if stats else 0.0,
+            "lastVisit": stats.last_visit if stats else None,
+            "topMedicines": json.loads(stats.top_medicines) if stats and stats.top_medicines else [],
+        },
+        "purchases": sales_out(db, sales, items, sale_rows, PURCHASE_FIELDS),
+        "limit": limit,
+        "offset": offset,
+    }
+
+@router.put("/api/accounts/profile")
+def update_profile(
+    updated_data: dict = Body(...),
+    db: Session = Depends(get_write_db),
+    request: Request = None,
+):
+    session_user = request.cookies.get("session_user")
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    account = account_by_username(db, session_user)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    # Check if the new email already exists (and isn't owned by this account)
+    new_email = updated_data.get("email")
+    if new_email and new_email != account.email:
+        if db.query(Account).filter(Account.email == new_email).first():
+            raise HTTPException(status_code=400, detail="Email already in use")
+
+    # Update the fields if provided
+    if "full_name" in updated_data:
+        account.full_name = updated_data["full_name"]
+
+    if "email" in updated_data:
+        account.email = updated_data["email"]
+
+    if "phone_number" in updated_data:
+        account.phone_number = updated_data["phone_number"]
+
+    if "address" in updated_data:
+        account.address = updated_data["address"]
+
+    db.commit()
+    shared_state.invalidate(f"account:{account.id}")
+    return {"message": "Profile updated successfully"}
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from ..backups import BackupInProgress, BackupTimedOut, list_backups, run_backup
+from ..config import get_settings
+from ..deps import get_current_user, get_read_db, is_admin
+from ..profiling import list_profiles, read_profile, sample_all_threads
+from ..request_queue import request_queue
+
+router = APIRouter()
+
+@router.get("/api/admin/capacity")
+def get_capacity(request: Request, db: Session = Depends(get_read_db)):
+    user = get_current_user(request, db)
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admins only")
+    return request_queue.stats()
+
+@router.get("/api/admin/backups")
+def get_backups(request: Request, db: Session = Depends(get_read_db)):
+    user = get_current_user(request, db)
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admins only")
+    return list_backups(get_settings().backup_dir)
+
+@router.post("/api/admin/backups")
+def create_backup(request: Request, db: Session = Depends(get_read_db)):
+    user = get_current_user(request, db)
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admins only")
+    db.close()  # the copy can take a while; don't hold a pooled connection for it
+    try:
+        return run_backup()
+    except BackupInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except BackupTimedOut as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+def require_profiling_admin(request: Request, db: Session):
+    if not get_settings().profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    user = get_current_user(request, db)
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admins only")
+
+@router.get("/api/admin/profiling")
+def get_profiles(request: Request, db: Session = Depends(get_read_db)):
+    require_profiling_admin(request, db)
+    return list_profiles(get_settings().profile_dir)
+
+@router.post("/api/admin/profiling/sample")
+def create_sample(request: Request, seconds: float = 10, db: Session = Depends(get_read_db)):
+    # Samples every thread for seconds (capped at profile_max_seconds) while other
+    # requests keep being served, then returns the collapsed-stack file's name
+    require_profiling_admin(request, db)
+    if seconds <= 0:
+        raise HTTPException(status_code=400, detail="seconds must be positive")
+    db.close()
+    try:
+        return {"name": sample_all_threads(seconds)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/api/admin/profiling/{name}", response_class=PlainTextResponse)
+def get_profile(name: str, request: Request, db: Session = Depends(get_read_db)):
+    require_profiling_admin(request, db)
+    content = read_profile(get_settings().profile_dir, name)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return content
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import bcrypt
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..deps import get_read_db, get_write_db
+from ..lookups import account_by_username
+from ..models import Account
+from ..rate_limit import check_account_rate
+from ..schemas import LoginData, RegisterData
+from ..state import shared_state
+
+router = APIRouter()
+
+@router.post("/api/auth/login")
+def login(data: LoginData, db: Session = Depends(get_write_db)):
+    # Per-account bucket on top of the per-client one: slows credential stuffing spread across IPs
+    check_account_rate("login_account", data.username.lower())
+
+    account = account_by_username(db, data.username)
+
+    if not account or not bcrypt.checkpw(data.password.encode(), account.password.encode()):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    if account.status != "active":
+        raise HTTPException(status_code=403, detail="Account is suspended")
+
+    response = JSONResponse(content={
+        "message": "Login successful",
+        "user": account.username,
+        "role": account.role,
+    })
+
+    response.set_cookie(
+        key="session_user",
+        value=account.username,
+        httponly=True,
+        samesite="Lax",
+    )
+    shared_state.set(f"session:{account.username}", {"role": account.role, "loginAt": datetime.utcnow()}, ttl=get_settings().session_ttl)
+
+    return response
+
+@router.post("/api/auth/logout")
+def logout(request: Request):
+    session_user = request.cookies.get("session_user")
+    if session_user:
+        shared_state.delete(f"session:{session_user}")
+
+    response = JSONResponse(content={"message": "Logged out"})
+    response.delete_cookie("session_user")
+    return response
+
+@router.post("/api/auth/register")
+def register(data: RegisterData, db: Session = Depends(get_write_db)):
+    if account_by_username(db, data.username):
+        raise HTTPException(status_code=400, detail="Username already exists")
+    if db.query(Account).filter(Account.email == data.email).first():
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    allowed_roles = {"customer", "pharmacist", "admin"}
+    if data.role not in allowed_roles:
+        raise HTTPException(status_code=400, detail="Invalid role")
+
+    hashed_pw = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
+
+    account = Account(
+        username=data.username,
+        password=hashed_pw,
+        email=data.email,
+        full_name=data.fullName,
+        phone_number=data.phone,
+        address=data.address,
+        role=data.role,
+    )
+
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    shared_state.invalidate(f"account:{account.id}")
+
+    return {"message": "Account created successfully", "user": account.username, "role": account.role}
+
+@router.get("/api/auth/me")
+def auth_me(request: Request, db: Session = Depends(get_read_db)):
+    try:
+        username = request.cookies.get("session_user")
+        if not username:
+            return Response(status_code=204)
+
+        account = account_by_username(db, username)
+        if not account:
+            return Response(status_code=204)
+
+        return {
+            "username": account.username,
+            "full_name": account.full_name,
+            "email": account.email,
+            "address": account.address,
+            "phone_number": account.phone_number,
+            "role": account.role,
+            "createdAt": account.created_at
+        }
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..deps import get_current_user, get_read_db, get_write_db, is_admin
+from ..fields import parse_fields, query_fields, rows_out
+from ..models import Category
+from ..schemas import CategoryCreate
+
+router = APIRouter()
+
+CATEGORY_FIELDS = {
+    "id": Category.id,
+    "name": Category.name,
+    "description": Category.description,
+    "created_at": Category.created_at,
+}
+
+@router.get("/api/categories")
+def get_categories(fields: Optional[str] = None, db: Session = Depends(get_read_db)):
+    selected = parse_fields(fields, CATEGORY_FIELDS)
+    return rows_out(query_fields(db, CATEGORY_FIELDS, selected).all(), selected)
+
+@router.post("/api/categories")
+def create_category(category: CategoryCreate, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only admin can create categories")
+
+    if db.query(Category).filter(Category.name == category.name).first():
+        raise HTTPException(status_code=400, detail="Category name already exists")
+
+    new_category = Category(
+        name=category.name,
+        description=category.description
+    )
+    db.add(new_category)
+    db.commit()
+    db.refresh(new_category)
+
+    return {
+        "id": new_category.id,
+        "name": new_category.name,
+        "description": new_category.description,
+        "created_at": new_category.created_at
+    }
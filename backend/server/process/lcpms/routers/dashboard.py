@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..deps import get_read_db
+from ..models import Account, Inventory, Medicine, Prescription, Sale
+from ..sales_archive import archived_sale_count
+
+router = APIRouter()
+
+@router.get("/api/dashboard/stats")
+def get_dashboard_stats(db: Session = Depends(get_read_db)):
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start + timedelta(days=1)
+
+    total_medicines = db.query(Medicine).count()
+    total_customers = db.query(Account).filter(Account.role == "customer").count()
+    total_prescriptions = db.query(Prescription).count()
+    low_stock_count = db.query(Inventory).filter(Inventory.quantity <= Inventory.min_stock_level).count()
+
+    total_sales = db.query(Sale).count() + archived_sale_count(db)
+    today_sales = db.query(Sale).filter(Sale.created_at >= today_start).count()
+
+    total_revenue = db.query(func.sum(Sale.total_amount)).filter(
+        Sale.status == "completed",
+        Sale.created_at >= today_start,
+        Sale.created_at < today_end
+    ).scalar() or 0
+
+    return {
+        "totalMedicines": total_medicines,
+        "totalCustomers": total_customers,
+        "totalPrescriptions": total_prescriptions,
+        "lowStockItems": low_stock_count,
+        "totalSales": total_sales,
+        "todaySales": today_sales,
+        "totalRevenue": float(total_revenue)
+    }
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..deps import get_current_user, get_read_db, get_write_db, is_admin, is_pharmacist_or_admin
+from ..fields import parse_fields, query_fields, rows_out
+from ..forecasting import recompute_reorder_points
+from ..ledger import record_movement, stock_at, take_stock_snapshots
+from ..lookups import medicine_by_id
+from ..models import Inventory, StockMovement
+from ..schemas import InventoryCreate, ReorderPointRecompute
+
+router = APIRouter()
+
+INVENTORY_FIELDS = {
+    "id": Inventory.id,
+    "medicineId": Inventory.medicine_id,
+    "quantity": Inventory.quantity,
+    "minStockLevel": Inventory.min_stock_level,
+    "batchNumber": Inventory.batch_number,
+    "expiryDate": Inventory.expiry_date,
+    "supplier": Inventory.supplier,
+    "created_at": Inventory.created_at,
+    "updated_at": Inventory.updated_at,
+}
+
+@router.get("/api/inventory")
+def get_inventory(fields: Optional[str] = None, db: Session = Depends(get_read_db)):
+    selected = parse_fields(fields, INVENTORY_FIELDS)
+    return rows_out(query_fields(db, INVENTORY_FIELDS, selected).all(), selected)
+
+@router.get("/api/inventory/low-stock")
+def get_low_stock_items(db: Session = Depends(get_read_db)):
+    inventory = db.query(Inventory).filter(Inventory.quantity <= Inventory.min_stock_level).all()
+    return [
+        {
+            "id": item.id,
+            "medicineId": item.medicine_id,
+            "quantity": item.quantity,
+            "minStockLevel": item.min_stock_level,
+            "batchNumber": item.batch_number,
+            "expiryDate": item.expiry_date,
+            "supplier": item.supplier,
+            "created_at": item.created_at,
+            "updated_at": item.updated_at
+        }
+        for item in inventory
+    ]
+
+@router.get("/api/inventory/stock-at")
+def get_stock_at(at: datetime, medicineId: Optional[int] = None, db: Session = Depends(get_read_db)):
+    balances = stock_at(db, at, medicineId)
+    return [
+        {
+            "inventoryId": inventory_id,
+            "medicineId": balance["medicineId"],
+            "quantity": balance["quantity"],
+        }
+        for inventory_id, balance in sorted(balances.items())
+    ]
+
+@router.get("/api/inventory/{inventory_id}/movements")
+def get_stock_movements(inventory_id: int, limit: int = 100, db: Session = Depends(get_read_db)):
+    movements = db.query(StockMovement).filter(
+        StockMovement.inventory_id == inventory_id
+    ).order_by(StockMovement.id.desc()).limit(limit).all()
+    return [
+        {
+            "id": movement.id,
+            "inventoryId": movement.inventory_id,
+            "medicineId": movement.medicine_id,
+            "movementType": movement.movement_type,
+            "quantity": movement.quantity,
+            "saleId": movement.sale_id,
+            "note": movement.note,
+            "createdAt": movement.created_at
+        }
+        for movement in movements
+    ]
+
+@router.post("/api/inventory/snapshots")
+def create_stock_snapshots(request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only admin can take stock snapshots")
+
+    return {"message": "Stock snapshots taken", "batches": take_stock_snapshots(db)}
+
+@router.post("/api/inventory")
+def create_inventory(inventory: InventoryCreate, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can manage inventory")
+
+    # Verify medicine exists
+    medicine = medicine_by_id(db, inventory.medicineId)
+    if not medicine:
+        raise HTTPException(status_code=400, detail="Medicine not found")
+
+    new_inventory = Inventory(
+        medicine_id=inventory.medicineId,
+        quantity=0,
+        min_stock_level=inventory.minStockLevel,
+        batch_number=inventory.batchNumber,
+        expiry_date=inventory.expiryDate,
+        supplier=inventory.supplier
+    )
+    db.add(new_inventory)
+    record_movement(db, new_inventory, "receipt", inventory.quantity)
+    db.commit()
+    db.refresh(new_inventory)
+
+    return {
+        "id": new_inventory.id,
+        "medicineId": new_inventory.medicine_id,
+        "quantity": new_inventory.quantity,
+        "minStockLevel": new_inventory.min_stock_level,
+        "batchNumber": new_inventory.batch_number,
+        "expiryDate": new_inventory.expiry_date,
+        "supplier": new_inventory.supplier,
+        "created_at": new_inventory.created_at,
+        "updated_at": new_inventory.updated_at
+    }
+
+@router.post("/api/inventory/reorder-points/recompute")
+def recompute_reorder_points_endpoint(options: ReorderPointRecompute, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only admin can recompute reorder points")
+
+    return recompute_reorder_points(db, options)
@@ -0,0 +1,230 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, update
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ..batch import fetch_in_order, parse_ids
+from ..catalog_import import import_medicine_csv
+from ..deps import get_current_user, get_read_db, get_write_db, is_pharmacist_or_admin
+from ..fields import parse_fields, query_fields, rows_out
+from ..ledger import record_movement
+from ..lookups import medicine_by_id
+from ..models import Category, Inventory, Medicine
+from ..schemas import FullMedicineCreate, MedicineBulkUpdate, MedicineUpdate
+from ..sku_index import publish_medicine_changes
+
+router = APIRouter()
+
+MEDICINE_FIELDS = {
+    "id": Medicine.id,
+    "name": Medicine.name,
+    "sku": Medicine.sku,
+    "categoryId": Medicine.category_id,
+    "description": Medicine.description,
+    "dosage": Medicine.dosage,
+    "manufacturer": Medicine.manufacturer,
+    "price": Medicine.price,
+    "requiresPrescription": Medicine.requires_prescription,
+    "created_at": Medicine.created_at,
+}
+
+@router.get("/api/medicines")
+def get_medicines(ids: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_read_db)):
+    selected = parse_fields(fields, MEDICINE_FIELDS)
+    if ids is None:
+        return rows_out(query_fields(db, MEDICINE_FIELDS, selected).all(), selected)
+
+    query = query_fields(db, MEDICINE_FIELDS, list(dict.fromkeys(["id"] + selected)))
+    rows = fetch_in_order(parse_ids(ids), lambda chunk: query.filter(Medicine.id.in_(chunk)).all())
+    return rows_out(rows, selected)
+
+@router.post("/api/medicines")
+def create_medicine(data: FullMedicineCreate, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can create medicines")
+
+    med = data.medicine
+    inv = data.inventory
+
+    # Check SKU uniqueness
+    if db.query(Medicine).filter(Medicine.sku == med.sku).first():
+        raise HTTPException(status_code=400, detail="SKU already exists")
+
+    # Check category
+    category = db.query(Category).filter(Category.id == med.categoryId).first()
+    if not category:
+        raise HTTPException(status_code=400, detail="Category not found")
+
+    # Create medicine
+    new_medicine = Medicine(
+        name=med.name,
+        sku=med.sku,
+        category_id=med.categoryId,
+        description=med.description,
+        dosage=med.dosage,
+        manufacturer=med.manufacturer,
+        price=med.price,
+        requires_prescription=med.requiresPrescription,
+    )
+    db.add(new_medicine)
+    db.commit()
+    db.refresh(new_medicine)
+
+    # Create inventory
+    inventory = Inventory(
+        medicine_id=new_medicine.id,
+        quantity=0,
+        min_stock_level=inv.minStock,
+        batch_number=inv.batchNumber,
+        expiry_date=inv.expiry,
+    )
+    db.add(inventory)
+    record_movement(db, inventory, "receipt", inv.initialQuantity)
+    db.commit()
+    publish_medicine_changes([new_medicine.id])
+
+    return {
+        "id": new_medicine.id,
+        "name": new_medicine.name,
+        "sku": new_medicine.sku,
+        "categoryId": new_medicine.category_id,
+        "description": new_medicine.description,
+        "dosage": new_medicine.dosage,
+        "manufacturer": new_medicine.manufacturer,
+        "price": new_medicine.price,
+        "requiresPrescription": new_medicine.requires_prescription,
+        "created_at": new_medicine.created_at
+    }
+
+@router.post("/api/medicines/import")
+async def import_medicines(request: Request, db: Session = Depends(get_write_db)):
+    try:
+        return await run_in_threadpool(import_medicine_csv, request, db)
+    except Exception:
+        db.rollback()
+        raise
+
+@router.get("/api/medicines/{medicine_id}")
+def get_medicine(medicine_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db)):
+    selected = parse_fields(fields, MEDICINE_FIELDS)
+    medicine = query_fields(db, MEDICINE_FIELDS, selected).filter(Medicine.id == medicine_id).first()
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+
+    return rows_out([medicine], selected)[0]
+
+@router.put("/api/medicines/{medicine_id}")
+def update_medicine(medicine_id: int, medicine_update: MedicineUpdate, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can update medicines")
+
+    medicine = medicine_by_id(db, medicine_id)
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+
+    # Check SKU uniqueness if it's being updated
+    if medicine_update.sku and medicine_update.sku != medicine.sku:
+        if db.query(Medicine).filter(Medicine.sku == medicine_update.sku).first():
+            raise HTTPException(status_code=400, detail="SKU already exists")
+
+    # Verify category exists if it's being updated
+    if medicine_update.categoryId:
+        category = db.query(Category).filter(Category.id == medicine_update.categoryId).first()
+        if not category:
+            raise HTTPException(status_code=400, detail="Category not found")
+
+    # Update fields
+    update_data = medicine_update.dict(exclude_unset=True)
+    if 'categoryId' in update_data:
+        update_data['category_id'] = update_data.pop('categoryId')
+    if 'requiresPrescription' in update_data:
+        update_data['requires_prescription'] = update_data.pop('requiresPrescription')
+
+    for field, value in update_data.items():
+        setattr(medicine, field, value)
+
+    db.commit()
+    db.refresh(medicine)
+    publish_medicine_changes([medicine.id])
+
+    return {
+        "id": medicine.id,
+        "name": medicine.name,
+        "sku": medicine.sku,
+        "categoryId": medicine.category_id,
+        "description": medicine.description,
+        "dosage": medicine.dosage,
+        "manufacturer": medicine.manufacturer,
+        "price": medicine.price,
+        "requiresPrescription": medicine.requires_prescription,
+        "created_at": medicine.created_at
+    }
+
+@router.delete("/api/medicines/{medicine_id}")
+def delete_medicine(medicine_id: int, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can delete medicines")
+
+    medicine = medicine_by_id(db, medicine_id)
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+
+    # Write off remaining stock, then delete associated inventory records
+    for inventory in db.query(Inventory).filter(Inventory.medicine_id == medicine_id).all():
+        if inventory.quantity:
+            record_movement(db, inventory, "adjustment", -inventory.quantity, note="medicine deleted")
+    db.flush()
+    db.query(Inventory).filter(Inventory.medicine_id == medicine_id).delete()
+    
+    # Delete the medicine
+    db.delete(medicine)
+    db.commit()
+    publish_medicine_changes([medicine_id])
+
+    return {"message": "Medicine deleted successfully"}
+
+@router.patch("/api/medicines/bulk")
+def bulk_update_medicines(data: MedicineBulkUpdate, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can update medicines")
+
+    filters = []
+    if data.filter.categoryId is not None:
+        filters.append(Medicine.category_id == data.filter.categoryId)
+    if data.filter.manufacturer:
+        filters.append(Medicine.manufacturer == data.filter.manufacturer)
+    if data.filter.skus:
+        filters.append(Medicine.sku.in_(data.filter.skus))
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+
+    if data.operation == "toggleRequiresPrescription":
+        values = {Medicine.requires_prescription: ~func.coalesce(Medicine.requires_prescription, False)}
+    elif data.value is None:
+        raise HTTPException(status_code=400, detail=f"'{data.operation}' requires a value")
+    elif data.operation == "setPrice":
+        if data.value < 0:
+            raise HTTPException(status_code=400, detail="Price cannot be negative")
+        values = {Medicine.price: data.value}
+    elif data.operation == "percentChange":
+        if data.value <= -100:
+            raise HTTPException(status_code=400, detail="Percentage change must be greater than -100")
+        values = {Medicine.price: func.round(Medicine.price * (1 + data.value / 100), 2)}
+    else:
+        values = {Medicine.requires_prescription: bool(data.value)}
+
+    # A single UPDATE .. WHERE .. RETURNING id; no rows are loaded into the session
+    changed_ids = db.execute(
+        update(Medicine).where(*filters).values(values).returning(Medicine.id),
+        execution_options={"synchronize_session": False},
+    ).scalars().all()
+    db.commit()
+    publish_medicine_changes(changed_ids)
+
+    return {"message": "Medicines updated successfully", "affected": len(changed_ids)}
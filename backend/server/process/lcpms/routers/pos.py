@@ -0,0 +1,13 @@
+from fastapi import APIRouter, HTTPException
+
+from ..sku_index import sku_index
+
+router = APIRouter()
+
+@router.get("/api/pos/scan/{sku}")
+def scan_sku(sku: str):
+    # A dict lookup in the SKU index; the database is only read after a catalog or stock change
+    entry = sku_index.lookup(sku)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    return entry
@@ -0,0 +1,124 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..deps import get_current_user, get_read_db, get_write_db, is_pharmacist_or_admin
+from ..fields import query_fields, rows_out
+from ..models import Account, Prescription
+from ..schemas import PrescriptionCreate, PrescriptionOut, PrescriptionQueue, PrescriptionUpdate
+
+router = APIRouter(prefix="/api/prescriptions", tags=["prescriptions"])
+
+PRESCRIPTION_FIELDS = {
+    "id": Prescription.id,
+    "prescriptionNumber": Prescription.prescription_number,
+    "customerId": Prescription.customer_id,
+    "customerName": Prescription.customer_name,
+    "doctorId": Prescription.doctor_id,
+    "doctorName": Prescription.doctor_name,
+    "issuedDate": Prescription.issued_date,
+    "notes": Prescription.notes,
+    "status": Prescription.status,
+    "verifiedAt": Prescription.verified_at,
+    "dispensedAt": Prescription.dispensed_at,
+}
+
+@router.get("", response_model=list[PrescriptionOut])
+@router.get("/", response_model=list[PrescriptionOut])
+def get_prescriptions(db: Session = Depends(get_read_db)):
+    return rows_out(query_fields(db, PRESCRIPTION_FIELDS, list(PRESCRIPTION_FIELDS)).all(), list(PRESCRIPTION_FIELDS))
+
+@router.get("/queue", response_model=PrescriptionQueue)
+def get_prescription_queue(
+    request: Request,
+    status: str = "pending",
+    pharmacistId: Optional[str] = None,
+    customerId: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    includeCounts: bool = False,
+    db: Session = Depends(get_read_db)
+):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can view the prescription queue")
+
+    limit = max(1, min(limit, 200))
+
+    filters = []
+    if pharmacistId:
+        filters.append(Prescription.pharmacist_id == pharmacistId)
+    if customerId:
+        filters.append(Prescription.customer_id == customerId)
+
+    selected = list(PRESCRIPTION_FIELDS)
+    rows = (
+        query_fields(db, PRESCRIPTION_FIELDS, selected)
+        .filter(Prescription.status == status, *filters)
+        .order_by(Prescription.issued_date.asc(), Prescription.id.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    queue = {"items": rows_out(rows, selected), "limit": limit, "offset": offset}
+
+    # Per-status counts group the whole (filtered) table, so pollers only ask for them
+    # when they show the badges
+    if includeCounts:
+        counts = dict(
+            db.query(Prescription.status, func.count(Prescription.id))
+            .filter(*filters)
+            .group_by(Prescription.status)
+            .all()
+        )
+        queue.update(counts=counts, total=counts.get(status, 0))
+    return queue
+
+@router.post("")
+def create_prescription(prescription: PrescriptionCreate, db: Session = Depends(get_write_db)):
+    # customerId is a username string now
+    customer = db.query(Account).filter(Account.username == prescription.customerId).first()
+    pharmacist = db.query(Account).filter(Account.username == prescription.pharmacistUsername).first()
+
+    if not customer or customer.role != "customer":
+        raise HTTPException(status_code=404, detail="Customer not found")
+    if not pharmacist or pharmacist.role != "pharmacist":
+        raise HTTPException(status_code=404, detail="Pharmacist not found")
+
+    new_prescription = Prescription(
+        customer_id=customer.username,
+        customer_name=customer.full_name,
+        pharmacist_id=pharmacist.username,
+        doctor_name=pharmacist.full_name, 
+        prescription_number=prescription.prescriptionNumber,
+        issued_date=prescription.issuedDate,
+        notes=prescription.notes,
+        status="pending"
+    )
+
+    db.add(new_prescription)
+    db.commit()
+
+    return {"message": "Prescription created successfully"}
+
+@router.put("/{id}")
+def update_prescription(
+    id: int,
+    update_data: PrescriptionUpdate,
+    request: Request,
+    db: Session = Depends(get_write_db)
+):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can update prescriptions")
+
+    presc = db.query(Prescription).filter(Prescription.id == id).first()
+    if not presc:
+        raise HTTPException(status_code=404, detail="Prescription not found")
+
+    presc.status = update_data.status.lower()
+    db.commit()
+
+    return {"message": "Prescription updated successfully"}
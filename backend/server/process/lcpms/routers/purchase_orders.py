@@ -0,0 +1,48 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..deps import get_current_user, get_read_db, get_write_db, is_pharmacist_or_admin
+from ..models import Medicine, ReorderRun, ReorderSuggestion
+from ..purchasing import refresh_purchase_suggestions
+
+router = APIRouter()
+
+@router.get("/api/purchase-orders/suggestions")
+def get_purchase_suggestions(supplier: Optional[str] = None, db: Session = Depends(get_read_db)):
+    query = db.query(ReorderSuggestion, Medicine.name, Medicine.sku).join(
+        Medicine, Medicine.id == ReorderSuggestion.medicine_id
+    )
+    if supplier:
+        query = query.filter(ReorderSuggestion.supplier == supplier)
+
+    groups = {}
+    for suggestion, name, sku in query.order_by(ReorderSuggestion.supplier, Medicine.name).all():
+        group = groups.setdefault(suggestion.supplier, {"supplier": suggestion.supplier, "totalUnits": 0, "items": []})
+        group["totalUnits"] += suggestion.suggested_quantity
+        group["items"].append({
+            "medicineId": suggestion.medicine_id,
+            "medicineName": name,
+            "sku": sku,
+            "onHand": suggestion.on_hand,
+            "expiringSoon": suggestion.expiring_soon,
+            "dailyDemand": suggestion.daily_demand,
+            "reorderPoint": suggestion.reorder_point,
+            "suggestedQuantity": suggestion.suggested_quantity,
+            "computedAt": suggestion.computed_at
+        })
+
+    last_run = db.query(ReorderRun).filter(ReorderRun.finished_at != None).order_by(ReorderRun.id.desc()).first()
+    return {
+        "suppliers": list(groups.values()),
+        "computedAt": last_run.finished_at if last_run else None,
+    }
+
+@router.post("/api/purchase-orders/suggestions/refresh")
+def refresh_purchase_suggestions_endpoint(request: Request, full: bool = False, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can refresh purchase suggestions")
+
+    return refresh_purchase_suggestions(db, full=full)
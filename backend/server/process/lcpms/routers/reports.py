@@ -0,0 +1,98 @@
+import json
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..deps import get_current_user, get_read_db, get_write_db, is_pharmacist_or_admin
+from ..models import DailyReport, ReportJob
+from ..reports import build_end_of_day_report, finish_report_job, report_job_lost, report_job_out, submit_report
+from ..schemas import EndOfDayReportRequest
+from ..tasks import WORKER_ID
+
+router = APIRouter()
+
+@router.post("/api/reports/end-of-day")
+def create_end_of_day_report(data: EndOfDayReportRequest, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can run reports")
+
+    settings = get_settings()
+    store_code = data.storeCode or settings.store_code
+    job_filter = (
+        ReportJob.report_type == "end_of_day",
+        ReportJob.store_code == store_code,
+        ReportJob.report_date == data.date,
+    )
+
+    cached = db.query(DailyReport).filter(
+        DailyReport.report_type == "end_of_day",
+        DailyReport.store_code == store_code,
+        DailyReport.report_date == data.date
+    ).first()
+    if cached and not data.refresh:
+        job = db.query(ReportJob).filter(*job_filter, ReportJob.status == "completed").order_by(ReportJob.id.desc()).first()
+        if job:
+            return report_job_out(job)
+
+    running = db.query(ReportJob).filter(*job_filter, ReportJob.status == "pending").first()
+    if running and not report_job_lost(running):
+        return report_job_out(running)
+    if running:
+        running.status = "failed"
+        running.error = "Interrupted: its worker process is gone"
+        running.finished_at = datetime.utcnow()
+
+    job = ReportJob(report_type="end_of_day", store_code=store_code, report_date=data.date, owner=WORKER_ID)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    try:
+        future = submit_report(
+            build_end_of_day_report, settings.database_url, store_code, data.date,
+            store_code == settings.store_code, settings.report_chunk_size
+        )
+    except BrokenProcessPool as e:
+        # Never leave a pending job behind that later requests would join and wait on
+        job.status = "failed"
+        job.error = repr(e)
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        raise HTTPException(status_code=503, detail="Report workers are unavailable, try again")
+    future.add_done_callback(lambda done, job_id=job.id: finish_report_job(job_id, done))
+
+    return report_job_out(job)
+
+@router.get("/api/reports/jobs/{job_id}")
+def get_report_job(job_id: int, request: Request, db: Session = Depends(get_read_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can view reports")
+
+    job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return report_job_out(job)
+
+@router.get("/api/reports/jobs/{job_id}/result")
+def get_report_job_result(job_id: int, request: Request, db: Session = Depends(get_read_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can view reports")
+
+    job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status}")
+
+    report = db.query(DailyReport).filter(
+        DailyReport.report_type == job.report_type,
+        DailyReport.store_code == job.store_code,
+        DailyReport.report_date == job.report_date
+    ).first()
+    return json.loads(report.payload)
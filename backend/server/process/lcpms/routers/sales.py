@@ -0,0 +1,263 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from ..batch import fetch_in_order, parse_ids
+from ..config import get_settings
+from ..deps import get_current_user, get_read_db, get_write_db, is_pharmacist_or_admin
+from ..fields import parse_fields
+from ..idempotency import claim_idempotency_key, release_idempotency_key, request_fingerprint, store_idempotent_response, wake_idempotency_waiters
+from ..ledger import record_movement
+from ..lookups import inventory_for_medicine, medicine_by_id
+from ..models import Account, Sale, SaleArchive, SaleItem, SaleItemArchive
+from ..sale_numbers import sale_number_allocator
+from ..sales_archive import SALE_FIELDS, is_archived, sales_out, sales_tables, select_sales
+from ..schemas import SaleCreate
+from ..tasks import enqueue_event
+
+router = APIRouter()
+
+@router.get("/api/sales")
+def get_sales(
+    dateFrom: Optional[datetime] = None,
+    dateTo: Optional[datetime] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    selected = parse_fields(fields, SALE_FIELDS)
+    if ids is not None:
+        return get_sales_by_ids(parse_ids(ids), selected, db)
+
+    # The archive is unioned in unless dateFrom starts after the newest archived sale, so
+    # an unbounded listing or an old dateTo still returns archived sales
+    sales, items = sales_tables(db, dateFrom)
+    query = select_sales(sales, selected).order_by(sales.c.created_at.desc())
+    if dateFrom:
+        query = query.where(sales.c.created_at >= dateFrom)
+    if dateTo:
+        query = query.where(sales.c.created_at < dateTo)
+    return sales_out(db, sales, items, db.execute(query).all(), selected)
+
+def get_sales_by_ids(sale_ids: list, selected: list, db: Session):
+    def fetch(sales):
+        return fetch_in_order(sale_ids, lambda chunk: db.execute(select_sales(sales, selected).where(sales.c.id.in_(chunk))).all())
+
+    sales, items = Sale.__table__, SaleItem.__table__
+    rows = fetch(sales)
+    if len(rows) < len(sale_ids):
+        # Some ids are not hot; look them up through the archive union
+        sales, items = sales_tables(db)
+        if sales is not Sale.__table__:
+            rows = fetch(sales)
+    return sales_out(db, sales, items, rows, selected)
+
+@router.get("/api/sales/{sale_id}")
+def get_sale(sale_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db)):
+    selected = parse_fields(fields, SALE_FIELDS)
+    sales, items = Sale.__table__, SaleItem.__table__
+    row = db.execute(select_sales(sales, selected).where(sales.c.id == sale_id)).first()
+    if not row:
+        sales, items = SaleArchive.__table__, SaleItemArchive.__table__
+        row = db.execute(select_sales(sales, selected).where(sales.c.id == sale_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Sale not found")
+
+    return sales_out(db, sales, items, [row], selected)[0]
+
+@router.post("/api/sales")
+def create_sale(
+    sale_data: SaleCreate,
+    request: Request,
+    db: Session = Depends(get_write_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can create sales")
+
+    if not idempotency_key:
+        return save_sale(sale_data, db)
+
+    key = f"{current_user.id}:{idempotency_key}"
+    stored = claim_idempotency_key(key, request_fingerprint(sale_data.model_dump(mode="json")))
+    if stored:
+        status_code, body = stored
+        return JSONResponse(status_code=status_code, content=body, headers={"Idempotent-Replayed": "true"})
+
+    try:
+        return save_sale(sale_data, db, idempotency_key=key)
+    except Exception:
+        # Failed attempts are not stored, so a corrected retry can reuse the key
+        db.rollback()
+        release_idempotency_key(key)
+        raise
+    finally:
+        wake_idempotency_waiters(key)
+
+def save_sale(sale_data: SaleCreate, db: Session, idempotency_key: Optional[str] = None):
+    # Validate customer exists if provided
+    if sale_data.customerId:
+        customer = db.query(Account).filter(
+            Account.id == sale_data.customerId, 
+            Account.role == "customer"
+        ).first()
+        if not customer:
+            raise HTTPException(status_code=400, detail="Customer not found")
+
+    # Validate pharmacist exists
+    pharmacist = db.query(Account).filter(
+        Account.id == sale_data.pharmacistId,
+        Account.role == "pharmacist"
+    ).first()
+    if not pharmacist:
+        raise HTTPException(status_code=400, detail="Pharmacist not found")
+
+    # Client-supplied numbers (legacy tills) still need a uniqueness check
+    if sale_data.saleNumber:
+        existing_sale = db.query(Sale.id).filter(Sale.sale_number == sale_data.saleNumber).first() or \
+            db.query(SaleArchive.id).filter(SaleArchive.sale_number == sale_data.saleNumber).first()
+        if existing_sale:
+            raise HTTPException(status_code=400, detail="Sale number already exists")
+
+    # Validate all medicines exist and have sufficient stock
+    for item in sale_data.items:
+        medicine = medicine_by_id(db, item.medicineId)
+        if not medicine:
+            raise HTTPException(status_code=400, detail=f"Medicine with ID {item.medicineId} not found")
+        
+        # Check inventory
+        inventory = inventory_for_medicine(db, item.medicineId)
+        if not inventory or inventory.quantity < item.quantity:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Insufficient stock for {medicine.name}. Available: {inventory.quantity if inventory else 0}, Required: {item.quantity}"
+            )
+
+    store_code = sale_data.storeCode or get_settings().store_code
+    sale_number = sale_data.saleNumber or sale_number_allocator.next(store_code)
+
+    # Create the sale
+    new_sale = Sale(
+        sale_number=sale_number,
+        store_code=store_code,
+        customer_id=sale_data.customerId,
+        pharmacist_id=sale_data.pharmacistId,
+        subtotal=float(sale_data.subtotal),
+        discount_amount=float(sale_data.discountAmount),
+        tax_amount=float(sale_data.taxAmount),
+        total_amount=float(sale_data.totalAmount),
+        payment_method=sale_data.paymentMethod,
+        status=sale_data.status,
+        notes=sale_data.notes
+    )
+    
+    db.add(new_sale)
+    db.flush()  # To get the sale ID
+
+    # Create sale items and update inventory
+    for item in sale_data.items:
+        medicine = medicine_by_id(db, item.medicineId)
+        unit_price = float(medicine.price)
+        total_price = unit_price * item.quantity
+
+        sale_item = SaleItem(
+            sale_id=new_sale.id,
+            medicine_id=item.medicineId,
+            quantity=item.quantity,
+            unit_price=unit_price,
+            total_price=total_price
+        )
+        db.add(sale_item)
+
+        # Update inventory
+        inventory = inventory_for_medicine(db, item.medicineId)
+        record_movement(db, inventory, "sale", -item.quantity, sale_id=new_sale.id)
+
+    enqueue_event(db, "sale.created", {
+        "saleId": new_sale.id,
+        "saleNumber": new_sale.sale_number,
+        "customerId": new_sale.customer_id,
+        "pharmacistId": new_sale.pharmacist_id,
+        "totalAmount": sale_data.totalAmount,
+        "status": new_sale.status,
+        "items": [{"medicineId": item.medicineId, "quantity": item.quantity} for item in sale_data.items],
+    })
+
+    result = {"message": "Sale created successfully", "saleId": new_sale.id, "saleNumber": new_sale.sale_number}
+    if idempotency_key:
+        store_idempotent_response(db, idempotency_key, 200, result)
+
+    db.commit()
+
+    return result
+
+@router.delete("/api/sales/{sale_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_sale(sale_id: int, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can delete sales")
+
+    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    if not sale:
+        if is_archived(db, sale_id):
+            raise HTTPException(status_code=409, detail="Sale is archived")
+        raise HTTPException(status_code=404, detail="Sale not found")
+
+    # Restore inventory before deletion if the sale is not refunded
+    if sale.status != "refunded":
+        for item in sale.sale_items:
+            inventory = inventory_for_medicine(db, item.medicine_id)
+            if inventory:
+                record_movement(db, inventory, "refund", item.quantity, sale_id=sale.id, note="sale deleted")
+
+    enqueue_event(db, "sale.deleted", {
+        "saleId": sale.id,
+        "saleNumber": sale.sale_number,
+        "customerId": sale.customer_id,
+        "status": sale.status,
+        "items": [{"medicineId": item.medicine_id, "quantity": item.quantity} for item in sale.sale_items],
+    })
+
+    db.delete(sale)
+    db.commit()
+
+@router.put("/api/sales/{sale_id}")
+def update_sale(sale_id: int, status: str, request: Request, db: Session = Depends(get_write_db)):
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can update sales")
+
+    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    if not sale:
+        if is_archived(db, sale_id):
+            raise HTTPException(status_code=409, detail="Sale is archived")
+        raise HTTPException(status_code=404, detail="Sale not found")
+
+    # Only allow certain status updates
+    allowed_statuses = ["completed", "pending", "refunded"]
+    if status not in allowed_statuses:
+        raise HTTPException(status_code=400, detail="Invalid status")
+
+    # If refunding, restore inventory
+    if status == "refunded" and sale.status != "refunded":
+        for item in sale.sale_items:
+            inventory = inventory_for_medicine(db, item.medicine_id)
+            if inventory:
+                record_movement(db, inventory, "refund", item.quantity, sale_id=sale.id)
+
+    enqueue_event(db, "sale.updated", {
+        "saleId": sale.id,
+        "saleNumber": sale.sale_number,
+        "customerId": sale.customer_id,
+        "previousStatus": sale.status,
+        "status": status,
+    })
+
+    sale.status = status
+    db.commit()
+
+    return {"message": "Sale updated successfully"}
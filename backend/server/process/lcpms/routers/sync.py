@@ -0,0 +1,68 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..batch import fetch_in_order
+from ..changes import changes_since, current_sequence
+from ..deps import get_current_user, get_read_db, is_pharmacist_or_admin
+from ..fields import query_fields, rows_out
+from ..models import Account, Category, Inventory, Medicine, Prescription
+from .accounts import USER_FIELDS
+from .categories import CATEGORY_FIELDS
+from .inventory import INVENTORY_FIELDS
+from .medicines import MEDICINE_FIELDS
+from .prescriptions import PRESCRIPTION_FIELDS
+
+router = APIRouter()
+
+# change_log entity -> (model, response fields shared with its list endpoint)
+SYNC_ENTITIES = {
+    "medicines": (Medicine, MEDICINE_FIELDS),
+    "inventory": (Inventory, INVENTORY_FIELDS),
+    "categories": (Category, CATEGORY_FIELDS),
+    "accounts": (Account, USER_FIELDS),
+    "prescriptions": (Prescription, PRESCRIPTION_FIELDS),
+}
+
+@router.get("/api/sync")
+def sync_changes(request: Request, since: Optional[int] = None, limit: int = 5000, db: Session = Depends(get_read_db)):
+    # Without a token, or with one ahead of this database (e.g. after a restore), the client
+    # gets every row and replaces its copy ("full": true). Otherwise it gets the rows written
+    # after the token and the ids deleted since, at most limit changes per call.
+    current_user = get_current_user(request, db)
+    if not is_pharmacist_or_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only pharmacists and admins can sync")
+
+    limit = max(1, min(limit, 20000))
+    sequence = current_sequence(db)
+    if not since or since > sequence:
+        return {
+            "token": sequence,
+            "full": True,
+            "hasMore": False,
+            "changes": {
+                entity: {"upserts": rows_out(query_fields(db, fields, list(fields)).all(), list(fields)), "deletes": []}
+                for entity, (model, fields) in SYNC_ENTITIES.items()
+            },
+        }
+
+    changes = changes_since(db, since, limit)
+    upsert_ids = {entity: [] for entity in SYNC_ENTITIES}
+    deletes = {entity: [] for entity in SYNC_ENTITIES}
+    for change in changes:
+        (deletes if change.deleted else upsert_ids)[change.entity].append(change.entity_id)
+
+    result = {}
+    for entity, (model, fields) in SYNC_ENTITIES.items():
+        query = query_fields(db, fields, list(fields))
+        # A row deleted after its change was read is skipped here; its tombstone has a later sequence
+        rows = fetch_in_order(upsert_ids[entity], lambda chunk: query.filter(model.id.in_(chunk)).all())
+        result[entity] = {"upserts": rows_out(rows, list(fields)), "deletes": deletes[entity]}
+
+    return {
+        "token": changes[-1].id if changes else since,
+        "full": False,
+        "hasMore": len(changes) == limit,
+        "changes": result,
+    }
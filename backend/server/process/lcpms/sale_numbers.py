@@ -0,0 +1,56 @@
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+from .config import get_settings
+from .database import SessionLocal
+from .models import SaleNumberSequence
+
+# Each worker reserves a block of numbers per store with a single UPDATE and hands them
+# out from memory. Blocks never overlap, so numbers are unique across workers and
+# increasing within a worker; unused numbers of a block are skipped when a worker exits.
+#
+# This deliberately weakens "monotonic within a store": with several workers, sales from
+# different workers interleave (worker A hands out 1-50 while worker B hands out 51-100),
+# so a store's numbers only increase per worker and do not follow creation order. Where
+# store-wide order matters more than the saved round trip, SALE_NUMBER_BLOCK_SIZE=1 makes
+# every sale reserve its own number from the sequence row, in the order sales ask for one.
+
+class SaleNumberAllocator:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.blocks = {}  # store_code -> (next number, end of block)
+
+    def next(self, store_code: str) -> str:
+        with self.lock:
+            current, end = self.blocks.get(store_code, (0, 0))
+            if current >= end:
+                current, end = self.reserve(store_code)
+            self.blocks[store_code] = (current + 1, end)
+        return f"{store_code}-{current:08d}"
+
+    def reserve(self, store_code: str):
+        block_size = get_settings().sale_number_block_size
+        db = SessionLocal()
+        try:
+            while True:
+                # The UPDATE takes the write lock, so the read below sees our own increment
+                reserved = db.query(SaleNumberSequence).filter(
+                    SaleNumberSequence.store_code == store_code
+                ).update({"next_value": SaleNumberSequence.next_value + block_size})
+                if reserved:
+                    end = db.query(SaleNumberSequence.next_value).filter(
+                        SaleNumberSequence.store_code == store_code
+                    ).scalar()
+                    db.commit()
+                    return end - block_size, end
+
+                db.add(SaleNumberSequence(store_code=store_code, next_value=1))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+        finally:
+            db.close()
+
+sale_number_allocator = SaleNumberAllocator()
@@ -0,0 +1,181 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, text, union_all
+
+from .config import get_settings
+from .models import Account, Medicine, Sale, SaleArchive, SaleItem, SaleItemArchive
+from .state import shared_state
+from .tasks import PeriodicJob
+
+# Completed and refunded sales older than sales_archive_after_days move, in chunks, from
+# sales/sale_items into sales_archive/sale_items_archive with their ids unchanged. Readers
+# call sales_tables() with the start of the range they need and only get the archive
+# unioned in when that range reaches back past the newest archived sale.
+
+logger = logging.getLogger(__name__)
+
+SALE_COLUMNS = [column.name for column in Sale.__table__.columns]
+ITEM_COLUMNS = [column.name for column in SaleItem.__table__.columns]
+ARCHIVED_COUNT_KEY = "sales-archive:count"
+
+def archive_old_sales(db):
+    settings = get_settings()
+    if settings.sales_archive_after_days <= 0:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(days=settings.sales_archive_after_days)
+    sales, items = Sale.__table__, SaleItem.__table__
+    moved = 0
+    while True:
+        ids = [sale_id for (sale_id,) in db.query(Sale.id).filter(
+            Sale.created_at < cutoff,
+            Sale.status.in_(("completed", "refunded"))
+        ).order_by(Sale.id).limit(settings.sales_archive_chunk_size)]
+        if not ids:
+            break
+
+        archived_at = datetime.utcnow()
+        db.execute(insert(SaleArchive.__table__).from_select(
+            SALE_COLUMNS + ["archived_at"],
+            select(*[sales.c[name] for name in SALE_COLUMNS], literal(archived_at)).where(sales.c.id.in_(ids))
+        ))
+        db.execute(insert(SaleItemArchive.__table__).from_select(
+            ITEM_COLUMNS,
+            select(*[items.c[name] for name in ITEM_COLUMNS]).where(items.c.sale_id.in_(ids))
+        ))
+        db.execute(delete(items).where(items.c.sale_id.in_(ids)))
+        db.execute(delete(sales).where(sales.c.id.in_(ids)))
+        # One transaction per chunk keeps the write lock short
+        db.commit()
+        moved += len(ids)
+
+    if moved:
+        logger.info("Archived %s sales created before %s", moved, cutoff)
+        shared_state.delete(ARCHIVED_COUNT_KEY)
+    return moved
+
+def protect_archived_ids(conn):
+    # sales and sale_items are AUTOINCREMENT tables, which never reuse an id at or below
+    # their sqlite_sequence entry. A database archived before they were makes sure that
+    # entry also covers ids that now only exist in the archive.
+    for table, archive in ((Sale.__table__, SaleArchive.__table__), (SaleItem.__table__, SaleItemArchive.__table__)):
+        archived_max = conn.execute(select(func.max(archive.c.id))).scalar()
+        if archived_max is None:
+            continue
+        sequence = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {"name": table.name}).first()
+        if sequence is None:
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": table.name, "seq": archived_max})
+        elif sequence.seq < archived_max:
+            conn.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :name"), {"name": table.name, "seq": archived_max})
+
+def archive_boundary(db) -> Optional[datetime]:
+    # created_at of the newest archived sale, served by ix_sales_archive_created_at
+    return db.execute(select(func.max(SaleArchive.created_at))).scalar()
+
+def archive_needed(db, since: Optional[datetime]) -> bool:
+    boundary = archive_boundary(db)
+    return boundary is not None and (since is None or since <= boundary)
+
+def sales_tables(db, since: Optional[datetime] = None):
+    # (sales, sale_items) selectables for reads starting at since (None: all time);
+    # db can be a Session or a Connection
+    if not archive_needed(db, since):
+        return Sale.__table__, SaleItem.__table__
+
+    sales_archive, items_archive = SaleArchive.__table__, SaleItemArchive.__table__
+    sales = union_all(
+        select(*[Sale.__table__.c[name] for name in SALE_COLUMNS]),
+        select(*[sales_archive.c[name] for name in SALE_COLUMNS])
+    ).subquery("all_sales")
+    items = union_all(
+        select(*[SaleItem.__table__.c[name] for name in ITEM_COLUMNS]),
+        select(*[items_archive.c[name] for name in ITEM_COLUMNS])
+    ).subquery("all_sale_items")
+    return sales, items
+
+def archived_sale_count(db) -> int:
+    count = shared_state.get(ARCHIVED_COUNT_KEY)
+    if count is None:
+        count = db.execute(select(func.count()).select_from(SaleArchive.__table__)).scalar()
+        shared_state.set(ARCHIVED_COUNT_KEY, count)
+    return count
+
+def is_archived(db, sale_id: int) -> bool:
+    return db.execute(select(SaleArchive.id).where(SaleArchive.id == sale_id)).first() is not None
+
+# Response key -> sales column it is built from; see fields.parse_fields
+SALE_FIELDS = {
+    "id": "id",
+    "saleNumber": "sale_number",
+    "customerId": "customer_id",
+    "customerName": "customer_id",
+    "pharmacistId": "pharmacist_id",
+    "pharmacistName": "pharmacist_id",
+    "subtotal": "subtotal",
+    "discountAmount": "discount_amount",
+    "taxAmount": "tax_amount",
+    "totalAmount": "total_amount",
+    "paymentMethod": "payment_method",
+    "status": "status",
+    "notes": "notes",
+    "createdAt": "created_at",
+    "items": "id",
+}
+
+def select_sales(sales, selected: list = None):
+    columns = {"id"} | {SALE_FIELDS[name] for name in selected or SALE_FIELDS}
+    return select(*[sales.c[name] for name in SALE_COLUMNS if name in columns])
+
+def sales_out(db, sales, items, sale_rows, selected: list = None):
+    # Sale rows (from select_sales over sales or the union) to the API shape, with one query
+    # each for items, people and medicines instead of one per sale, and none for keys
+    # that were not selected
+    selected = selected or list(SALE_FIELDS)
+    sale_ids = [row.id for row in sale_rows]
+    items_by_sale = {}
+    if sale_ids and "items" in selected:
+        for item in db.execute(select(items).where(items.c.sale_id.in_(sale_ids)).order_by(items.c.id)):
+            items_by_sale.setdefault(item.sale_id, []).append(item)
+
+    account_ids = set()
+    if "pharmacistName" in selected:
+        account_ids |= {row.pharmacist_id for row in sale_rows}
+    if "customerName" in selected:
+        account_ids |= {row.customer_id for row in sale_rows if row.customer_id}
+    names = dict(db.query(Account.id, Account.full_name).filter(Account.id.in_(account_ids))) if account_ids else {}
+    medicine_ids = {item.medicine_id for sale_items in items_by_sale.values() for item in sale_items}
+    medicine_names = dict(db.query(Medicine.id, Medicine.name).filter(Medicine.id.in_(medicine_ids))) if medicine_ids else {}
+
+    def value(row, name):
+        if name == "customerName":
+            return names.get(row.customer_id, "Unknown") if row.customer_id else "Walk-in Customer"
+        if name == "pharmacistName":
+            return names.get(row.pharmacist_id, "Unknown")
+        if name == "items":
+            return [
+                {
+                    "id": item.id,
+                    "medicineId": item.medicine_id,
+                    "medicineName": medicine_names.get(item.medicine_id, "Unknown"),
+                    "quantity": item.quantity,
+                    "unitPrice": float(item.unit_price),
+                    "totalPrice": float(item.total_price)
+                }
+                for item in items_by_sale.get(row.id, [])
+            ]
+        column_value = getattr(row, SALE_FIELDS[name])
+        if name in ("subtotal", "discountAmount", "taxAmount", "totalAmount"):
+            return float(column_value)
+        return column_value
+
+    return [{name: value(row, name) for name in selected} for row in sale_rows]
+
+sales_archive_job = PeriodicJob("sales-archive", archive_old_sales)
+
+def start_sales_archive_job():
+    sales_archive_job.start(get_settings().sales_archive_interval)
+
+def stop_sales_archive_job():
+    sales_archive_job.stop()
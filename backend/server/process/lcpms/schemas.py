@@ -0,0 +1,236 @@
+import re
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, EmailStr, Field, validator
+
+class LoginData(BaseModel):
+    username: str
+    password: str
+
+class RegisterData(BaseModel):
+    username: str
+    password: str
+    email: EmailStr
+    fullName: str
+    phone: str | None = None
+    address: str | None = None
+    role: str  # Will validate below
+
+class PrescriptionCreate(BaseModel):
+    customerId: str
+    pharmacistUsername: str
+    prescriptionNumber: str
+    issuedDate: date
+    notes: str | None = None
+
+class PrescriptionUpdate(BaseModel):
+    status: Literal["Approved", "Discard"]
+
+class PrescriptionOut(BaseModel):
+    id: int
+    prescriptionNumber: str
+    customerId: str
+    customerName: str
+    doctorId: Optional[int] = None
+    doctorName: Optional[str] = None
+    issuedDate: date
+    notes: Optional[str]
+    status: str
+    verifiedAt: Optional[datetime] = None
+    dispensedAt: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class PrescriptionQueue(BaseModel):
+    items: List[PrescriptionOut]
+    counts: Optional[dict[str, int]] = None
+    total: Optional[int] = None
+    limit: int
+    offset: int
+
+class UpdateCustomerData(BaseModel):
+    fullName: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+
+class CategoryCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+class CategoryOut(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+    created_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class MedicineCreate(BaseModel):
+    name: str
+    sku: str
+    categoryId: int
+    description: Optional[str] = None
+    dosage: Optional[str] = None
+    manufacturer: Optional[str] = None
+    price: float
+    requiresPrescription: bool = False
+
+class MedicineUpdate(BaseModel):
+    name: Optional[str] = None
+    sku: Optional[str] = None
+    categoryId: Optional[int] = None
+    description: Optional[str] = None
+    dosage: Optional[str] = None
+    manufacturer: Optional[str] = None
+    price: Optional[float] = None
+    requiresPrescription: Optional[bool] = None
+
+class MedicineBulkFilter(BaseModel):
+    categoryId: Optional[int] = None
+    manufacturer: Optional[str] = None
+    skus: Optional[List[str]] = None
+
+class MedicineBulkUpdate(BaseModel):
+    filter: MedicineBulkFilter
+    operation: Literal["setPrice", "percentChange", "setRequiresPrescription", "toggleRequiresPrescription"]
+    value: Optional[float] = None  # price, percentage, or 1/0 for setRequiresPrescription
+
+class EndOfDayReportRequest(BaseModel):
+    date: date
+    storeCode: Optional[str] = None
+    refresh: bool = False
+
+class ReorderPointRecompute(BaseModel):
+    method: Literal["ema", "sma"] = "ema"
+    lookbackDays: int = Field(730, ge=1)
+    window: int = Field(28, ge=0)  # sma window, and the window used for demand variability
+    alpha: float = Field(0.1, gt=0, le=1)  # ema smoothing factor; 0 would zero every weight
+    leadTimeDays: float = Field(7, ge=0)
+    serviceLevelZ: float = Field(1.65, ge=0)  # ~95% cycle service level
+    minLevel: int = Field(1, ge=0)
+
+class MedicineOut(BaseModel):
+    id: int
+    name: str
+    sku: str
+    categoryId: int
+    description: Optional[str]
+    dosage: Optional[str]
+    manufacturer: Optional[str]
+    price: float
+    requiresPrescription: bool
+    created_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class InventoryCreate(BaseModel):
+    initialQuantity: int = 0
+    minStock: int = 10
+    batchNumber: Optional[str] = None
+    expiry: Optional[date] = None
+
+    @validator("batchNumber")
+    def validate_batch(cls, v):
+        if v and not re.match(r"^BATCH\d{4}$", v):
+            raise ValueError("batchNumber must follow format 'BATCH####'")
+        return v
+
+class FullMedicineCreate(BaseModel):
+    medicine: MedicineCreate
+    inventory: InventoryCreate
+
+class InventoryCreate(BaseModel):
+    medicineId: int
+    quantity: int
+    minStockLevel: int = 10
+    batchNumber: Optional[str] = None
+    expiryDate: Optional[date] = None
+    supplier: Optional[str] = None
+
+class InventoryOut(BaseModel):
+    id: int
+    medicineId: int
+    quantity: int
+    minStockLevel: int
+    batchNumber: Optional[str]
+    expiryDate: Optional[date]
+    supplier: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+    @classmethod
+    def from_orm(cls, obj):
+        return cls(
+            id=obj.id,
+            medicineId=obj.medicine_id,
+            quantity=obj.quantity,
+            minStockLevel=obj.min_stock_level,
+            batchNumber=obj.batch_number,
+            expiryDate=obj.expiry_date,
+            supplier=obj.supplier,
+            created_at=obj.created_at,
+            updated_at=obj.updated_at
+        )
+    
+class SaleItemCreate(BaseModel):
+    medicineId: int
+    quantity: int
+
+class SaleItemOut(BaseModel):
+    id: int
+    medicineId: int
+    medicineName: str
+    quantity: int
+    unitPrice: float
+    totalPrice: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class SaleCreate(BaseModel):
+    customerId: Optional[int] = None  # None for walk-in customers
+    pharmacistId: int
+    saleNumber: Optional[str] = None  # Deprecated: generated server-side when omitted
+    storeCode: Optional[str] = None
+    subtotal: str
+    discountAmount: str = "0"
+    taxAmount: str
+    totalAmount: str
+    paymentMethod: str
+    status: str = "completed"
+    notes: Optional[str] = None
+    items: List[SaleItemCreate] = []
+
+class SaleOut(BaseModel):
+    id: int
+    saleNumber: str
+    customerId: Optional[int]
+    customerName: Optional[str]
+    pharmacistId: int
+    pharmacistName: str
+    subtotal: float
+    discountAmount: float
+    taxAmount: float
+    totalAmount: float
+    paymentMethod: str
+    status: str
+    notes: Optional[str]
+    createdAt: datetime
+    items: List[SaleItemOut] = []
+
+    model_config = {
+        "from_attributes": True
+    }
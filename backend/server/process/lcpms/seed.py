@@ -0,0 +1,159 @@
+import random
+from datetime import date, timedelta
+
+import bcrypt
+
+from .database import SessionLocal
+from .ledger import record_movement
+from .models import Account, Category, Inventory, Medicine, Prescription
+
+def seed_demo_data():
+    db = SessionLocal()
+
+    def hash_password(raw):
+        return bcrypt.hashpw(raw.encode(), bcrypt.gensalt()).decode()
+
+    # Create admin account
+    if not db.query(Account).filter(Account.username == "admin").first():
+        db.add(Account(
+            username="admin",
+            password=hash_password("test123"),
+            email="wow@gmail.com",
+            full_name="Test",
+            role="admin",
+            status="active",
+        ))
+
+    # Seed customers
+    customer_data = [
+        ("alice", "alice1@gmail.com", "Alice Johnson"),
+        ("bob", "bob2@gmail.com", "Bob Smith"),
+        ("carol", "carol3@gmail.com", "Carol White"),
+        ("david", "david4@gmail.com", "David Brown"),
+        ("eve", "eve5@gmail.com", "Eve Black"),
+        ("frank", "frank6@gmail.com", "Frank Green"),
+        ("grace", "grace7@gmail.com", "Grace Lee"),
+    ]
+    addresses = ["123 Baker Street", "42 Wallaby Way"]
+    phones = ["0901234567", "0912345678", "0987654321"]
+
+    for username, email, full_name in customer_data:
+        if not db.query(Account).filter(Account.username == username).first():
+            db.add(Account(
+                username=username,
+                password=hash_password("test123"),
+                email=email,
+                full_name=full_name,
+                role="customer",
+                status="active",
+                address=addresses.pop() if addresses else None,
+                phone_number=phones.pop() if phones else None
+            ))
+
+    # Seed pharmacists
+    pharmacist_data = [
+        ("pharma1", "pharma1@gmail.com", "Dr. John Med"),
+        ("pharma2", "pharma2@gmail.com", "Dr. Jane Cure"),
+        ("pharma3", "pharma3@gmail.com", "Dr. Amy Dose"),
+    ]
+    for username, email, full_name in pharmacist_data:
+        if not db.query(Account).filter(Account.username == username).first():
+            db.add(Account(
+                username=username,
+                password=hash_password("test123"),
+                email=email,
+                full_name=full_name,
+                role="pharmacist",
+                status="active"
+            ))
+
+    db.commit()  # Commit users before using them
+
+    # Seed categories
+    categories_data = [
+        ("Pain Relief", "Medications for pain management"),
+        ("Antibiotics", "Antimicrobial medications"),
+        ("Vitamins", "Vitamin supplements"),
+        ("Heart Medication", "Cardiovascular medications"),
+        ("Diabetes", "Diabetes management medications"),
+        ("Cold & Flu", "Medications for cold and flu symptoms"),
+    ]
+
+    for name, description in categories_data:
+        if not db.query(Category).filter(Category.name == name).first():
+            db.add(Category(name=name, description=description))
+
+    db.commit()  # Commit categories before using them
+
+    # Seed medicines
+    categories = db.query(Category).all()
+    medicines_data = [
+        ("Paracetamol", "PARA500", "Pain Relief", "Effective pain and fever relief", "500mg", "Generic Pharma", 5.99, False),
+        ("Amoxicillin", "AMOX250", "Antibiotics", "Broad-spectrum antibiotic", "250mg", "MedCorp", 12.50, True),
+        ("Vitamin C", "VITC1000", "Vitamins", "Immune system support", "1000mg", "HealthPlus", 8.99, False),
+        ("Lisinopril", "LISI10", "Heart Medication", "ACE inhibitor for blood pressure", "10mg", "CardioMed", 15.75, True),
+        ("Metformin", "METF500", "Diabetes", "Type 2 diabetes medication", "500mg", "DiaCare", 18.25, True),
+        ("Ibuprofen", "IBU200", "Pain Relief", "Anti-inflammatory pain reliever", "200mg", "Generic Pharma", 7.50, False),
+    ]
+
+    category_dict = {cat.name: cat.id for cat in categories}
+
+    for name, sku, cat_name, desc, dosage, manufacturer, price, requires_rx in medicines_data:
+        if not db.query(Medicine).filter(Medicine.sku == sku).first():
+            medicine = Medicine(
+                name=name,
+                sku=sku,
+                category_id=category_dict.get(cat_name, 1),
+                description=desc,
+                dosage=dosage,
+                manufacturer=manufacturer,
+                price=price,
+                requires_prescription=requires_rx
+            )
+            db.add(medicine)
+
+    db.commit()  # Commit medicines before creating inventory
+
+    # Seed inventory
+    medicines = db.query(Medicine).all()
+    for medicine in medicines:
+        if not db.query(Inventory).filter(Inventory.medicine_id == medicine.id).first():
+            inventory = Inventory(
+                medicine_id=medicine.id,
+                quantity=0,
+                min_stock_level=random.randint(10, 20),
+                batch_number=f"BATCH{random.randint(1000, 9999)}",
+                expiry_date=date.today() + timedelta(days=random.randint(30, 365)),
+                supplier=f"Supplier {random.randint(1, 5)}"
+            )
+            db.add(inventory)
+            record_movement(db, inventory, "receipt", random.randint(5, 100), note="seed")
+
+    # Seed prescriptions
+    customers = db.query(Account).filter(Account.role == "customer").all()
+    pharmacists = db.query(Account).filter(Account.role == "pharmacist").all()
+
+    if not db.query(Prescription).filter(Prescription.id == "10").first():
+        for i in range(10):
+            customer = random.choice(customers)
+            pharmacist = random.choice(pharmacists)
+            prescription_number = f"RX-{random.randint(100000, 999999)}"
+            issued_date = date.today() - timedelta(days=random.randint(30, 150))
+
+            exists = db.query(Prescription).filter(Prescription.prescription_number == prescription_number).first()
+            if exists:
+                continue  # skip duplicates
+
+            db.add(Prescription(
+                customer_id=customer.username,
+                customer_name=customer.full_name,
+                pharmacist_id=pharmacist.username,
+                doctor_name=pharmacist.full_name,
+                prescription_number=prescription_number,
+                issued_date=issued_date,
+                notes="Sample prescription",
+                status="pending"
+            ))
+
+    db.commit()
+    db.close()
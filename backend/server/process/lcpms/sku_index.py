@@ -0,0 +1,141 @@
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import Inventory, Medicine
+from .state import shared_state
+
+# SKU -> scan result (medicine, stock summed over its batches, prescription flag) kept in
+# memory so a till scan is a dict lookup. Catalog writes publish the ids they changed as
+# "medicine:<id>,<id>,..." (see publish_medicine_changes) and the next scan re-reads just
+# those rows, dropping ones that were deleted or whose SKU moved; stock movements publish
+# "stock:<medicine id>", which makes the next scan of that medicine re-read its row. Those
+# reads go to the primary: a lagging replica would put old stock back into the index.
+
+# Ids per published key, so a catalog import publishes a handful of keys, not one per row
+MEDICINE_KEY_IDS = 500
+
+def publish_medicine_changes(medicine_ids):
+    # Call after the write commits, like the other shared_state invalidations
+    medicine_ids = sorted(set(medicine_ids))
+    for start in range(0, len(medicine_ids), MEDICINE_KEY_IDS):
+        shared_state.invalidate("medicine:" + ",".join(map(str, medicine_ids[start:start + MEDICINE_KEY_IDS])))
+
+class SkuIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # sku -> scan result
+        self.loaded = False
+        self.skus = {}  # medicine id -> sku of its entry
+        self.dirty = set()  # medicine ids whose stock changed since they were read
+        self.changed = set()  # medicine ids whose catalog row changed since they were read
+
+    def invalidate(self, key: str):
+        with self.lock:
+            if key.startswith("medicine:"):
+                self.changed.update(int(medicine_id) for medicine_id in key[len("medicine:"):].split(","))
+            elif key.startswith("stock:"):
+                self.dirty.add(int(key[len("stock:"):]))
+
+    def query(self, db: Session):
+        return db.query(
+            Medicine.id, Medicine.name, Medicine.sku, Medicine.category_id, Medicine.dosage,
+            Medicine.manufacturer, Medicine.price, Medicine.requires_prescription,
+            func.coalesce(func.sum(Inventory.quantity), 0).label("stock")
+        ).outerjoin(Inventory, Inventory.medicine_id == Medicine.id).group_by(Medicine.id)
+
+    def entry(self, row) -> dict:
+        return {
+            "id": row.id,
+            "name": row.name,
+            "sku": row.sku,
+            "categoryId": row.category_id,
+            "dosage": row.dosage,
+            "manufacturer": row.manufacturer,
+            "price": row.price,
+            "requiresPrescription": row.requires_prescription,
+            "stock": int(row.stock),
+        }
+
+    def load(self, db: Session):
+        # Invalidations that arrive while the query runs stay pending for the next scan
+        with self.lock:
+            self.dirty.clear()
+            self.changed.clear()
+        entries = {row.sku: self.entry(row) for row in self.query(db)}
+        with self.lock:
+            self.entries = entries
+            self.skus = {entry["id"]: sku for sku, entry in entries.items()}
+            self.loaded = True
+
+    def apply_changes(self, db: Session):
+        # Re-reads the changed medicines; past half the catalog a full load is cheaper
+        with self.lock:
+            changed = set(self.changed)
+            self.changed -= changed
+            self.dirty -= changed
+            reload = len(changed) > len(self.entries) // 2
+        if reload:
+            self.load(db)
+            return
+        ids = sorted(changed)
+        rows = []
+        for start in range(0, len(ids), MEDICINE_KEY_IDS):
+            rows += self.query(db).filter(Medicine.id.in_(ids[start:start + MEDICINE_KEY_IDS])).all()
+        with self.lock:
+            for medicine_id in changed:
+                sku = self.skus.pop(medicine_id, None)
+                if sku is not None and self.entries.get(sku, {}).get("id") == medicine_id:
+                    del self.entries[sku]
+            for row in rows:
+                self.entries[row.sku] = self.entry(row)
+                self.skus[row.id] = row.sku
+
+    def refresh(self, db: Session, sku: str, medicine_id: int):
+        with self.lock:
+            self.dirty.discard(medicine_id)
+        row = self.query(db).filter(Medicine.id == medicine_id).first()
+        with self.lock:
+            if row is None:
+                self.entries.pop(sku, None)
+                self.skus.pop(medicine_id, None)
+            else:
+                self.entries[row.sku] = self.entry(row)
+                self.skus[row.id] = row.sku
+
+    def lookup(self, sku: str):
+        with self.lock:
+            loaded, changed = self.loaded, bool(self.changed)
+        if not loaded:
+            self.warm()
+        elif changed:
+            db = SessionLocal()
+            try:
+                self.apply_changes(db)
+            finally:
+                db.close()
+
+        with self.lock:
+            entry = self.entries.get(sku)
+            dirty = entry is not None and entry["id"] in self.dirty
+        if dirty:
+            db = SessionLocal()
+            try:
+                self.refresh(db, sku, entry["id"])
+            finally:
+                db.close()
+            with self.lock:
+                entry = self.entries.get(sku)
+        return entry
+
+    def warm(self):
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+
+sku_index = SkuIndex()
+shared_state.on_invalidate(sku_index.invalidate)
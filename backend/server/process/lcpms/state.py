@@ -0,0 +1,200 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+
+from .config import Settings
+
+# Per-process state (sessions, caches, rate limits) goes through shared_state so it stays
+# consistent when the app runs under several workers. "memory" is for a single worker;
+# "sqlite" keeps entries in a file every worker on the host opens. Workers keep local
+# caches and drop them when an invalidation is published; other workers see it within
+# state_invalidation_interval seconds.
+
+logger = logging.getLogger(__name__)
+
+class SharedState(ABC):
+    def __init__(self):
+        self.invalidation_handlers = []
+
+    @abstractmethod
+    def get(self, key: str, default=None):
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    def on_invalidate(self, handler):
+        # handler(key) runs in every worker, for keys published by any worker
+        self.invalidation_handlers.append(handler)
+        return handler
+
+    def invalidate(self, key: str):
+        self.dispatch_invalidation(key)
+
+    def dispatch_invalidation(self, key: str):
+        for handler in self.invalidation_handlers:
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Invalidation handler failed for %s", key)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class InProcessState(SharedState):
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> (value, expires_at)
+
+    def get(self, key: str, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self.entries[key]
+                return default
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        with self.lock:
+            self.entries[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+class SQLiteState(SharedState):
+    def __init__(self, path: str, poll_interval: float):
+        # create_engine connects lazily; the file is opened and prepared in start()
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+        self.stopping = threading.Event()
+        self.thread = None
+        self.own_invalidations = set()
+        self.last_invalidation = 0
+
+    def create_tables(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("PRAGMA journal_mode=WAL"))
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS state_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS state_invalidations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, created_at REAL NOT NULL)"
+            ))
+            self.last_invalidation = conn.execute(
+                text("SELECT COALESCE(MAX(id), 0) FROM state_invalidations")
+            ).scalar()
+
+    def get(self, key: str, default=None):
+        with self.engine.connect() as conn:
+            value = conn.execute(
+                text("SELECT value FROM state_entries WHERE key = :key AND (expires_at IS NULL OR expires_at > :now)"),
+                {"key": key, "now": time.time()}
+            ).scalar()
+        return default if value is None else json.loads(value)
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("INSERT OR REPLACE INTO state_entries (key, value, expires_at) VALUES (:key, :value, :expires_at)"),
+                {"key": key, "value": json.dumps(value, default=str), "expires_at": time.time() + ttl if ttl else None}
+            )
+
+    def delete(self, key: str):
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM state_entries WHERE key = :key"), {"key": key})
+
+    def invalidate(self, key: str):
+        with self.engine.begin() as conn:
+            invalidation_id = conn.execute(
+                text("INSERT INTO state_invalidations (key, created_at) VALUES (:key, :now) RETURNING id"),
+                {"key": key, "now": time.time()}
+            ).scalar()
+        # Local handlers run now; the poller skips invalidations already dispatched here
+        self.own_invalidations.add(invalidation_id)
+        self.dispatch_invalidation(key)
+
+    def start(self):
+        self.create_tables()
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name="state-invalidations", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=10)
+            self.thread = None
+
+    def run(self):
+        last_cleanup = 0
+        while not self.stopping.wait(self.poll_interval):
+            try:
+                self.poll_invalidations()
+                if time.time() - last_cleanup > 60:
+                    self.cleanup()
+                    last_cleanup = time.time()
+            except Exception:
+                logger.exception("Shared state poll failed")
+
+    def poll_invalidations(self):
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT id, key FROM state_invalidations WHERE id > :last ORDER BY id"),
+                {"last": self.last_invalidation}
+            ).all()
+        for invalidation_id, key in rows:
+            self.last_invalidation = invalidation_id
+            if invalidation_id in self.own_invalidations:
+                self.own_invalidations.discard(invalidation_id)
+                continue
+            self.dispatch_invalidation(key)
+
+    def cleanup(self):
+        now = time.time()
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM state_entries WHERE expires_at IS NOT NULL AND expires_at <= :now"), {"now": now})
+            # Keep invalidations long enough for every worker's poller to have seen them
+            conn.execute(text("DELETE FROM state_invalidations WHERE created_at < :cutoff"), {"cutoff": now - 300})
+
+def create_shared_state(settings: Settings) -> SharedState:
+    if settings.state_backend == "memory":
+        return InProcessState()
+    if settings.state_backend == "sqlite":
+        return SQLiteState(settings.state_db_path, settings.state_invalidation_interval)
+    raise ValueError(f"Unknown STATE_BACKEND: {settings.state_backend}")
+
+class SharedStateHandle:
+    # The object other modules import. create_app picks the backend behind it; handlers
+    # registered with on_invalidate at import time carry over to that backend.
+    def __init__(self):
+        self.backend = InProcessState()
+
+    def configure(self, backend: SharedState):
+        backend.invalidation_handlers = self.backend.invalidation_handlers
+        self.backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+shared_state = SharedStateHandle()
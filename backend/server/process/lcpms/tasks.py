@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import SessionLocal
+from .models import TaskOutbox
+
+# Side effects (analytics, audit, notifications, receipts) subscribe to domain events.
+# Events are written to the task_outbox table inside the caller's transaction and
+# executed by a small pool of worker threads once that transaction commits. Routes only
+# emit events that have a subscriber; add the enqueue_event call with the handler.
+
+logger = logging.getLogger(__name__)
+# Identifies this process in claimed_by/owner columns shared by every worker process
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+event_handlers = {}
+task_handlers = {}
+
+def subscribe(event_name: str):
+    def decorator(func):
+        handler_name = f"{func.__module__}.{func.__qualname__}"
+        event_handlers.setdefault(event_name, []).append(handler_name)
+        task_handlers[handler_name] = func
+        return func
+    return decorator
+
+def enqueue_event(db: Session, event_name: str, payload: dict):
+    # One outbox row per subscriber so a failing handler is retried on its own
+    for handler_name in event_handlers.get(event_name, []):
+        db.add(TaskOutbox(
+            event=event_name,
+            handler=handler_name,
+            payload=json.dumps(payload, default=str),
+        ))
+        db.info["tasks_enqueued"] = True
+
+class TaskQueue:
+    def __init__(self):
+        self.poll_interval = 2.0
+        self.max_attempts = 5
+        self.lease_seconds = 300.0
+        self.next_reclaim = 0.0
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.threads = []
+
+    def start(self):
+        settings = get_settings()
+        self.poll_interval = settings.task_poll_interval
+        self.max_attempts = settings.task_max_attempts
+        self.lease_seconds = settings.task_lease_seconds
+        self.next_reclaim = 0.0
+
+        self.stopping.clear()
+        for i in range(settings.task_workers):
+            thread = threading.Thread(target=self.run, name=f"task-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join(timeout=10)
+        self.threads = []
+
+    def notify(self):
+        self.wakeup.set()
+
+    def reclaim_expired(self, db: Session):
+        # Other processes share the outbox, so only tasks whose lease ran out (their worker
+        # died) go back to pending; tasks claimed before leases existed have no claimed_at
+        expired = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        reclaimed = db.query(TaskOutbox).filter(
+            TaskOutbox.status == "running",
+            or_(TaskOutbox.claimed_at == None, TaskOutbox.claimed_at < expired)
+        ).update({"status": "pending", "claimed_by": None, "claimed_at": None}, synchronize_session=False)
+        db.commit()
+        if reclaimed:
+            logger.warning("Reclaimed %s tasks whose lease expired", reclaimed)
+
+    def claim(self, db: Session):
+        while True:
+            task = db.query(TaskOutbox).filter(
+                TaskOutbox.status == "pending",
+                TaskOutbox.available_at <= datetime.utcnow()
+            ).order_by(TaskOutbox.id).first()
+            if not task:
+                return None
+
+            # Conditional update so two workers never run the same task; a lost race
+            # moves on to the next pending task
+            claimed = db.query(TaskOutbox).filter(
+                TaskOutbox.id == task.id,
+                TaskOutbox.status == "pending"
+            ).update({
+                "status": "running",
+                "claimed_by": f"{WORKER_ID}:{threading.current_thread().name}",
+                "claimed_at": datetime.utcnow(),
+            })
+            db.commit()
+            if claimed:
+                return task
+
+    def run(self):
+        while not self.stopping.is_set():
+            db = SessionLocal()
+            try:
+                if time.monotonic() >= self.next_reclaim:
+                    self.next_reclaim = time.monotonic() + self.lease_seconds / 2
+                    self.reclaim_expired(db)
+                task = self.claim(db)
+                if task is None:
+                    db.close()
+                    self.wakeup.wait(self.poll_interval)
+                    self.wakeup.clear()
+                    continue
+                self.execute(db, task)
+            except Exception:
+                logger.exception("Task worker loop failed")
+                db.rollback()
+                self.stopping.wait(self.poll_interval)
+            finally:
+                db.close()
+
+    def execute(self, db: Session, task: TaskOutbox):
+        handler = task_handlers.get(task.handler)
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered as {task.handler}")
+            handler(json.loads(task.payload), db)
+            # Handler writes and task removal commit together
+            db.delete(task)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            task.attempts += 1
+            task.last_error = repr(e)
+            if task.attempts >= self.max_attempts:
+                task.status = "failed"
+                logger.error("Task %s (%s) failed permanently: %r", task.id, task.handler, e)
+            else:
+                task.status = "pending"
+                task.claimed_by = task.claimed_at = None
+                task.available_at = datetime.utcnow() + timedelta(seconds=min(2 ** task.attempts, 300))
+            db.commit()
+
+task_queue = TaskQueue()
+
+@event.listens_for(SessionLocal, "after_commit")
+def notify_task_queue(db):
+    if db.info.pop("tasks_enqueued", False):
+        task_queue.notify()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def discard_task_notification(db):
+    db.info.pop("tasks_enqueued", None)
+
+class PeriodicJob:
+    # Runs func(db) every interval seconds on a daemon thread; interval <= 0 disables it
+    def __init__(self, name: str, func):
+        self.name = name
+        self.func = func
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self, interval: float):
+        if interval <= 0:
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, args=(interval,), name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=10)
+            self.thread = None
+
+    def run(self, interval: float):
+        while not self.stopping.wait(interval):
+            db = SessionLocal()
+            try:
+                self.func(db)
+            except Exception:
+                logger.exception("Periodic job %s failed", self.name)
+                db.rollback()
+            finally:
+                db.close()
@@ -0,0 +1,41 @@
+import os
+import sys
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Run from backend/server/process:  python -m pytest -q
+PROCESS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROCESS_DIR)
+
+from lcpms.app import create_app  # noqa: E402
+from lcpms.config import Settings  # noqa: E402
+
+PASSWORD = "test123"
+
+@pytest.fixture
+def settings(tmp_path):
+    # A fresh seeded database per test; nothing reads the environment or the project's data.db
+    return replace(
+        Settings(),
+        database_path=str(tmp_path / "data.db"),
+        backup_dir=str(tmp_path / "backups"),
+        profile_dir=str(tmp_path / "profiles"),
+        backup_interval=0,
+        rate_limits={route_class: {"rate": 1000, "burst": 1000} for route_class in ("auth", "heavy", "polling", "default")},
+    )
+
+@pytest.fixture
+def client(settings):
+    with TestClient(create_app(settings)) as client:
+        yield client
+
+def login(client: TestClient, username: str):
+    response = client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+
+@pytest.fixture
+def admin(client):
+    login(client, "admin")
+    return client
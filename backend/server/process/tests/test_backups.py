@@ -0,0 +1,99 @@
+import os
+import sqlite3
+
+import pytest
+
+from lcpms import backups
+from lcpms.backups import BackupTimedOut, copy_database
+
+ROWS = 2000
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "source.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany("INSERT INTO t (v) VALUES (?)", [("x" * 200,) for _ in range(ROWS)])
+    conn.commit()
+    conn.close()
+    return path
+
+class Writer:
+    # Stands in for time.sleep inside copy_database: each call (between steps and before
+    # a retry) first commits a row to the source from another connection, which makes
+    # SQLite restart the copy, until `writes` rows have gone in (None: never stop)
+    def __init__(self, path: str, writes=None):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS test_writes (v TEXT)")
+        self.conn.commit()
+        self.writes = writes
+        self.written = 0
+        self.sleeps = []
+
+    def __call__(self, seconds: float):
+        self.sleeps.append(seconds)
+        if self.writes is None or self.written < self.writes:
+            self.conn.execute("INSERT INTO test_writes (v) VALUES ('w')")
+            self.conn.commit()
+            self.written += 1
+
+def row_count(path: str, table: str = "t") -> int:
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_quiet_database_copies_in_one_attempt(source, tmp_path):
+    target = str(tmp_path / "copy.db")
+    stats = copy_database(source, target, pages=8, step_sleep=0)
+
+    assert stats["attempts"] == 1
+    assert stats["restarts"] == 0
+    assert stats["steps"] > 1
+    assert row_count(target) == ROWS
+
+def test_restarting_copy_backs_off_and_retries_stepped(source, tmp_path, monkeypatch):
+    writer = Writer(source, writes=4)
+    monkeypatch.setattr(backups.time, "sleep", writer)
+    target = str(tmp_path / "copy.db")
+
+    stats = copy_database(source, target, pages=8, step_sleep=0.001, max_restarts=2, retry_delay=0.5)
+
+    assert stats["attempts"] == 2
+    assert stats["restarts"] >= 3
+    # Every step stayed a small one: the retry was stepped, never a single whole-file copy
+    assert stats["steps"] > stats["pages"] // 8
+    assert 0.5 in writer.sleeps
+    assert row_count(target) == ROWS
+    assert row_count(target, "test_writes") == writer.written
+
+def test_retry_delay_doubles_per_attempt(source, tmp_path, monkeypatch):
+    writer = Writer(source, writes=8)
+    monkeypatch.setattr(backups.time, "sleep", writer)
+
+    stats = copy_database(source, str(tmp_path / "copy.db"), pages=8, step_sleep=0.001, max_restarts=1, retry_delay=0.5)
+
+    assert stats["attempts"] >= 3
+    assert [seconds for seconds in writer.sleeps if seconds >= 0.5][:2] == [0.5, 1.0]
+
+def test_copy_that_never_settles_times_out(source, tmp_path, monkeypatch):
+    writer = Writer(source)
+    monkeypatch.setattr(backups.time, "sleep", writer)
+
+    with pytest.raises(BackupTimedOut, match="did not finish within"):
+        copy_database(source, str(tmp_path / "copy.db"), pages=8, step_sleep=0.001, max_restarts=1, max_seconds=0.5, retry_delay=0.01)
+
+def test_run_backup_reports_timeout_and_leaves_no_staging_file(admin, settings, monkeypatch):
+    monkeypatch.setattr(settings, "backup_pages", 1)
+    monkeypatch.setattr(settings, "backup_max_restarts", 0)
+    monkeypatch.setattr(settings, "backup_max_seconds", 0.2)
+    monkeypatch.setattr(settings, "backup_retry_delay", 0.01)
+    monkeypatch.setattr(backups.time, "sleep", Writer(settings.database_path))
+
+    response = admin.post("/api/admin/backups")
+
+    assert response.status_code == 503
+    assert backups.list_backups(settings.backup_dir) == []
+    assert not any(name.endswith(".tmp") for name in os.listdir(settings.backup_dir))
@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timedelta
+
+from lcpms.database import SessionLocal
+from lcpms.idempotency import purge_expired_idempotency_keys
+from lcpms.models import IdempotencyKey, Sale
+
+def sale_payload(client, quantity: int = 1) -> dict:
+    pharmacist_id = client.get("/api/users", params={"role": "pharmacist"}).json()[0]["id"]
+    medicine_id = client.get("/api/medicines").json()[0]["id"]
+    return {
+        "pharmacistId": pharmacist_id,
+        "subtotal": "5",
+        "taxAmount": "0",
+        "totalAmount": "5",
+        "paymentMethod": "cash",
+        "items": [{"medicineId": medicine_id, "quantity": quantity}],
+    }
+
+def sale_count() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Sale).count()
+    finally:
+        db.close()
+
+def test_checkout_retry_replays_stored_response(admin):
+    payload = sale_payload(admin)
+    before = sale_count()
+
+    first = admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0001"})
+    replay = admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0001"})
+
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == first.json()
+    assert sale_count() == before + 1
+
+def test_key_reused_for_different_checkout_is_rejected(admin):
+    payload = sale_payload(admin)
+    assert admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0002"}).status_code == 200
+
+    response = admin.post("/api/sales", json=sale_payload(admin, quantity=2), headers={"Idempotency-Key": "till-1-0002"})
+    assert response.status_code == 422
+
+def test_concurrent_duplicates_create_one_sale(admin):
+    payload = sale_payload(admin)
+    before = sale_count()
+    responses = []
+
+    def checkout():
+        responses.append(admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0003"}))
+
+    threads = [threading.Thread(target=checkout) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert len({response.json()["saleId"] for response in responses}) == 1
+    assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 3
+    assert sale_count() == before + 1
+
+def test_failed_checkout_releases_its_key(admin):
+    payload = sale_payload(admin, quantity=10**6)
+    assert admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0004"}).status_code == 400
+
+    payload["items"][0]["quantity"] = 1
+    response = admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0004"})
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+def test_cleanup_job_purges_only_expired_keys(admin):
+    payload = sale_payload(admin)
+    admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0005"})
+    admin.post("/api/sales", json=payload, headers={"Idempotency-Key": "till-1-0006"})
+
+    db = SessionLocal()
+    try:
+        expired = db.query(IdempotencyKey).filter(IdempotencyKey.key.endswith(":till-1-0005")).one()
+        expired.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+
+        purge_expired_idempotency_keys(db)
+        remaining = [key for (key,) in db.query(IdempotencyKey.key)]
+        assert len(remaining) == 1 and remaining[0].endswith(":till-1-0006")
+    finally:
+        db.close()
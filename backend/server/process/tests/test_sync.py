@@ -0,0 +1,71 @@
+def sync(client, since=None) -> dict:
+    response = client.get("/api/sync", params={} if since is None else {"since": since})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def upsert_ids(result: dict, entity: str) -> set:
+    return {row["id"] for row in result["changes"][entity]["upserts"]}
+
+def test_first_sync_is_full(admin):
+    result = sync(admin)
+
+    assert result["full"] is True
+    assert result["token"] > 0
+    assert len(result["changes"]["medicines"]["upserts"]) == len(admin.get("/api/medicines").json())
+
+def test_delta_after_delete_carries_tombstones(admin):
+    token = sync(admin)["token"]
+    medicine = admin.get("/api/medicines").json()[0]
+    batch_ids = {row["id"] for row in admin.get("/api/inventory").json() if row["medicineId"] == medicine["id"]}
+    assert batch_ids
+
+    assert admin.delete(f"/api/medicines/{medicine['id']}").status_code == 200
+    result = sync(admin, token)
+
+    assert result["full"] is False
+    assert result["changes"]["medicines"]["deletes"] == [medicine["id"]]
+    assert medicine["id"] not in upsert_ids(result, "medicines")
+    assert set(result["changes"]["inventory"]["deletes"]) == batch_ids
+    assert not upsert_ids(result, "inventory") & batch_ids
+
+    # Nothing changed since: the token holds and the delta is empty
+    again = sync(admin, result["token"])
+    assert again["token"] == result["token"]
+    assert all(not entity["upserts"] and not entity["deletes"] for entity in again["changes"].values())
+
+def test_write_then_delete_in_one_window_sends_only_the_delete(admin):
+    token = sync(admin)["token"]
+    medicine = admin.get("/api/medicines").json()[1]
+
+    assert admin.put(f"/api/medicines/{medicine['id']}", json={"price": 99.5}).status_code == 200
+    assert admin.delete(f"/api/medicines/{medicine['id']}").status_code == 200
+    result = sync(admin, token)
+
+    assert result["changes"]["medicines"]["deletes"] == [medicine["id"]]
+    assert medicine["id"] not in upsert_ids(result, "medicines")
+
+def test_delta_pages_follow_the_token(admin):
+    token = sync(admin)["token"]
+    medicines = admin.get("/api/medicines").json()[:3]
+    for medicine in medicines:
+        assert admin.put(f"/api/medicines/{medicine['id']}", json={"price": 1.25}).status_code == 200
+
+    first = admin.get("/api/sync", params={"since": token, "limit": 2}).json()
+    rest = sync(admin, first["token"])
+
+    assert first["hasMore"] is True
+    assert rest["hasMore"] is False
+    assert upsert_ids(first, "medicines") | upsert_ids(rest, "medicines") == {medicine["id"] for medicine in medicines}
+    assert all(row["price"] == 1.25 for row in rest["changes"]["medicines"]["upserts"])
+
+def test_token_ahead_of_database_forces_full_sync(admin):
+    token = sync(admin)["token"]
+    result = sync(admin, token + 1000)
+
+    assert result["full"] is True
+    assert result["token"] == token
+
+def test_sync_requires_staff(client):
+    assert client.get("/api/sync").status_code == 401
+    client.post("/api/auth/login", json={"username": "alice", "password": "test123"})
+    assert client.get("/api/sync").status_code == 403
@@ -149,14 +149,12 @@ export default function ProcessSaleModal({
       return;
     }
 
-    const saleNumber = `SALE-${Date.now().toString().slice(-6)}`;
     const subtotal = getTotal();
     const tax = subtotal * 0.1;
     const total = subtotal + tax;
 
     createSale.mutate({
       ...data,
-      saleNumber,
       items: saleItems.map((it) => ({
         medicineId: it.medicineId,
         quantity: it.quantity,